@@ -0,0 +1,228 @@
+"""
+A word list that changes while it is being queried.
+
+LadderDictionary keeps the pattern buckets of PatternIndex up to date as
+words come and go, one bucket per letter of the word, and caches shortest
+path results.  An update only drops the cached results it could change:
+
+- removing a word drops the results whose graph holds it;
+- adding a word drops a result of d steps from start to end only if the
+  word could lie on a ladder of at most d steps, that is
+  hamming(start, word) + hamming(word, end) <= d;
+- adding a word drops a "no ladder" result only if the word joins the
+  start and end into one component.
+
+Components are labelled with a union-find over the words, built when a
+"no ladder" result first needs checking and extended as words are added.
+Removals can split components, which a union-find cannot undo, so a
+removal only marks the labelling for a rebuild at that next check.
+"""
+from bisect import insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from find_ladders import (
+    PatternIndex,
+    find_shortest_path,
+    hamming,
+    iter_paths,
+    patterns,
+)
+
+# Cached shortest path graph and its number of steps, or None and 0.
+Entry = Tuple[Optional[Mapping[str, Set[str]]], int]
+
+
+class LadderDictionary(PatternIndex):
+    """
+    >>> words = LadderDictionary({"hot", "dot", "dog", "lot", "log", "cog"})
+    >>> len(words.shortest_ladders("hit", "cog"))
+    2
+    >>> words.add_word("hog")
+    >>> words.remove_word("lot")
+    >>> words.shortest_ladders("hit", "cog")
+    [['hit', 'hot', 'hog', 'cog']]
+    >>> words.shortest_ladders("hit", "cog") == LadderDictionary(words.words).shortest_ladders("hit", "cog")
+    True
+
+    Changes far from a cached ladder keep it:
+
+    >>> words.shortest_ladders("dot", "dog")
+    [['dot', 'dog']]
+    >>> words.add_word("mix"), words.remove_word("log")
+    (None, None)
+    >>> words.hits, words.misses, words.invalidated
+    (1, 3, 1)
+    >>> words.shortest_ladders("dot", "dog"), words.hits
+    ([['dot', 'dog']], 2)
+
+    and so do additions that join only one side of a "no ladder" result:
+
+    >>> words = LadderDictionary({"hot", "dot", "cog", "mix"})
+    >>> words.shortest_ladders("hit", "cog")
+    >>> words.add_word("max"), words.add_word("hat"), words.add_word("cat"), words.invalidated
+    (None, None, None, 0)
+    >>> words.add_word("cot"), words.invalidated
+    (None, 1)
+    >>> words.shortest_ladders("hit", "cog")
+    [['hit', 'hot', 'cot', 'cog']]
+
+    Random updates give the same ladders as a fresh dictionary:
+
+    >>> import random
+    >>> rng = random.Random(7)
+    >>> letters = "abc"
+    >>> pool = [x + y + z for x in letters for y in letters for z in letters]
+    >>> words = LadderDictionary(rng.sample(pool, 6), cache_size=64)
+    >>> queries = [tuple(rng.sample(pool, 2)) for _ in range(20)]
+    >>> agree = True
+    >>> for _ in range(200):
+    ...     word = rng.choice(pool)
+    ...     if word in words:
+    ...         words.remove_word(word)
+    ...     else:
+    ...         words.add_word(word)
+    ...     start, end = rng.choice(queries)
+    ...     fresh = LadderDictionary(words.words).shortest_ladders(start, end)
+    ...     agree = agree and words.shortest_ladders(start, end) == fresh
+    >>> agree, words.hits > 0
+    (True, True)
+    """
+
+    def __init__(self, words: Iterable[str], cache_size: int = 1024) -> None:
+        super().__init__(words)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._cache: "OrderedDict[Tuple[str, str], Entry]" = OrderedDict()
+        # Union-find parents over the words, or None until (re)built.
+        self._parents: Optional[Dict[str, str]] = None
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def add_word(self, word: str) -> None:
+        if word in self.words:
+            return
+        self.words.add(word)
+        for pattern in patterns(word):
+            insort(self.buckets.setdefault(pattern, []), word)
+
+        no_ladders = False
+        stale = []
+        for key, (graph, steps) in self._cache.items():
+            start, end = key
+            if len(word) != len(start):
+                continue
+            if graph is None:
+                no_ladders = True
+            elif hamming(start, word) + hamming(word, end) <= steps:
+                stale.append(key)
+
+        if no_ladders or self._parents is not None:
+            component = self._join(word)
+            for key, (graph, _) in self._cache.items():
+                start, end = key
+                if (
+                    graph is None
+                    and end in self.words
+                    and self._find(end) == component
+                    and self._reaches(start, component)
+                ):
+                    stale.append(key)
+        self._drop(stale)
+
+    def remove_word(self, word: str) -> None:
+        self.words.remove(word)
+        for pattern in patterns(word):
+            bucket = self.buckets[pattern]
+            bucket.remove(word)
+            if not bucket:
+                del self.buckets[pattern]
+
+        self._parents = None
+        self._drop(
+            [
+                key
+                for key, (graph, _) in self._cache.items()
+                if graph is not None and word in graph
+            ]
+        )
+
+    def _drop(self, stale: List[Tuple[str, str]]) -> None:
+        for key in stale:
+            del self._cache[key]
+        self.invalidated += len(stale)
+
+    def _find(self, word: str) -> str:
+        assert self._parents is not None
+        parents = self._parents
+        root = word
+        while parents[root] != root:
+            root = parents[root]
+        while parents[word] != root:
+            parents[word], word = root, parents[word]
+        return root
+
+    def _join(self, word: str) -> str:
+        """
+        Merges word, just added, into the components of its neighbours,
+        building the labelling first if there is none; returns its component.
+        """
+        if self._parents is None:
+            self._parents = {w: w for w in self.words}
+            for w in self.words:
+                for next_word in self.adjacent(w):
+                    self._parents[self._find(next_word)] = self._find(w)
+            return self._find(word)
+
+        self._parents[word] = word
+        for next_word in self.adjacent(word):
+            self._parents[self._find(next_word)] = self._find(word)
+        return self._find(word)
+
+    def _reaches(self, start: str, component: str) -> bool:
+        """Whether start, in the dictionary or not, reaches component."""
+        if start in self.words:
+            return self._find(start) == component
+        return any(
+            self._find(next_word) == component for next_word in self.adjacent(start)
+        )
+
+    def shortest_path(
+        self, start_word: str, end_word: str
+    ) -> Optional[Mapping[str, Set[str]]]:
+        key = (start_word, end_word)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        graph = find_shortest_path(start_word, end_word, self.words, self)
+        self._cache[key] = (graph, _steps(graph, start_word, end_word))
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return graph
+
+    def shortest_ladders(
+        self, start_word: str, end_word: str
+    ) -> Optional[List[List[str]]]:
+        graph = self.shortest_path(start_word, end_word)
+        if graph is None:
+            return None
+        return list(iter_paths(graph, start_word, end_word))
+
+
+def _steps(
+    graph: Optional[Mapping[str, Set[str]]], start_word: str, end_word: str
+) -> int:
+    steps = 0
+    if graph is not None:
+        word = start_word
+        while word != end_word:
+            word = next(iter(graph[word]))
+            steps += 1
+    return steps
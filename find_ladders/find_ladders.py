@@ -1,12 +1,39 @@
+import heapq
 import json
-from functools import lru_cache
+from array import array
+from bisect import bisect_left
 from pathlib import Path
-from typing import Dict, Generator, List, Mapping, Optional, Sequence, Set, TypedDict
+from typing import (
+    AbstractSet,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+    TypedDict,
+    cast,
+)
 
 import graphviz
 
 
-@lru_cache
+def hamming(word: str, other_word: str) -> int:
+    """
+    Letters that differ between two words of the same length, a lower
+    bound on the steps of any ladder between them.
+
+    >>> hamming("hit", "cog")
+    3
+    """
+    return sum(x != y for (x, y) in zip(word, other_word))
+
+
 def is_next_word_for(word: str, next_word: str) -> bool:
     """
     >>> is_next_word_for("dot","dog")
@@ -15,12 +42,159 @@ def is_next_word_for(word: str, next_word: str) -> bool:
     >>> is_next_word_for("dot","hog")
     False
 
+    Only words of the same length are next to each other, as in every
+    index over the dictionary:
+
+    >>> is_next_word_for("aab","b")
+    False
     """
-    return len([x == y for (x, y) in zip([*word], [*next_word]) if x != y]) == 1
+    return len(word) == len(next_word) and hamming(word, next_word) == 1
+
+
+def patterns(word: str) -> List[str]:
+    """
+    >>> patterns("hit")
+    ['*it', 'h*t', 'hi*']
+    """
+    return [word[:i] + "*" + word[i + 1 :] for i in range(len(word))]
+
+
+class PatternIndex:
+    """
+    Words bucketed by wildcard pattern, so the words one letter away from
+    a word are found with one bucket lookup per letter instead of a scan
+    of the whole dictionary.
+
+    >>> index = PatternIndex({"hot", "dot", "dog", "lot", "log", "cog"})
+    >>> index.buckets["*ot"]
+    ['dot', 'hot', 'lot']
+    >>> sorted(index.adjacent("hit"))
+    ['hot']
+    >>> sorted(index.adjacent("dot"))
+    ['dog', 'hot', 'lot']
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words: Set[str] = set(words)
+        self.buckets: Dict[str, List[str]] = {}
+        for word in sorted(self.words):
+            for pattern in patterns(word):
+                self.buckets.setdefault(pattern, []).append(word)
+
+    def adjacent(self, word: str) -> Set[str]:
+        r = {
+            next_word
+            for pattern in patterns(word)
+            for next_word in self.buckets.get(pattern, [])
+        }
+        r.discard(word)
+        return r
+
+
+class WordGraph(AbstractSet[str]):
+    """
+    A dictionary interned to dense integer ids, in sorted word order, with
+    its neighbour lists stored as CSR arrays: the neighbours of id i are
+    targets[offsets[i]:offsets[i + 1]].
+
+    >>> graph = WordGraph({"hot", "dot", "dog", "lot", "log", "cog"})
+    >>> graph.words, graph.offsets.tolist(), graph.targets.tolist()
+    (['cog', 'dog', 'dot', 'hot', 'log', 'lot'], [0, 2, 5, 8, 10, 13, 16], [1, 4, 0, 2, 4, 1, 3, 5, 2, 5, 0, 1, 5, 2, 3, 4])
+    >>> graph.id("dot"), [graph.word(i) for i in graph.neighbours(2)], sorted(graph.adjacent_ids("hit"))
+    (2, ['dog', 'hot', 'lot'], [3])
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words: List[str] = sorted(set(words))
+        self.ids: Dict[str, int] = {word: i for i, word in enumerate(self.words)}
+        buckets: Dict[str, List[int]] = {}
+        for i, word in enumerate(self.words):
+            for pattern in patterns(word):
+                buckets.setdefault(pattern, []).append(i)
+
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        for i, word in enumerate(self.words):
+            neighbours = {j for pattern in patterns(word) for j in buckets[pattern]}
+            neighbours.discard(i)
+            self.targets.extend(sorted(neighbours))
+            self.offsets.append(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self.ids
+
+    def id(self, word: str) -> Optional[int]:
+        return self.ids.get(word)
+
+    def word(self, id: int) -> str:
+        return self.words[id]
+
+    def neighbours(self, id: int) -> Sequence[int]:
+        return self.targets[self.offsets[id] : self.offsets[id + 1]]
+
+    def adjacent_ids(self, word: str) -> Iterable[int]:
+        id = self.ids.get(word)
+        if id is not None:
+            return self.neighbours(id)
+        return [
+            i
+            for i, next_word in enumerate(self.words)
+            if len(next_word) == len(word) and is_next_word_for(word, next_word)
+        ]
+
+    def adjacent(self, word: str) -> Set[str]:
+        return {self.words[i] for i in self.adjacent_ids(word)}
+
+
+class IdGraph(Protocol):
+    """A dictionary with integer word ids, like WordGraph or WordIndex."""
 
+    def __len__(self) -> int:
+        ...
 
-def adjacent_words(word: str, words: Set[str], visited: Set[str]) -> Set[str]:
-    """ """
+    def id(self, word: str) -> Optional[int]:
+        ...
+
+    def word(self, id: int) -> str:
+        ...
+
+    def neighbours(self, id: int) -> Sequence[int]:
+        ...
+
+    def adjacent_ids(self, word: str) -> Iterable[int]:
+        ...
+
+
+class Index(Protocol):
+    """Anything that finds the words one letter away from a word."""
+
+    def adjacent(self, word: str) -> Set[str]:
+        ...
+
+
+def adjacent_words(
+    word: str, words: Set[str], visited: Set[str], index: Optional[Index] = None
+) -> Set[str]:
+    """
+    Words one letter away from word that are not visited yet, looked up in
+    index when there is one and found by scanning words otherwise.
+
+    >>> words = {"hot", "dot", "dog", "lot", "log", "cog"}
+    >>> sorted(adjacent_words("dot", words, {"hot"}))
+    ['dog', 'lot']
+    >>> sorted(adjacent_words("dot", words, {"hot"}, PatternIndex(words)))
+    ['dog', 'lot']
+    """
+    if index is not None:
+        return {
+            next_word for next_word in index.adjacent(word) if next_word not in visited
+        }
     r = {
         next_word
         for next_word in words
@@ -29,11 +203,31 @@ def adjacent_words(word: str, words: Set[str], visited: Set[str]) -> Set[str]:
     return r
 
 
+def frontier_words(
+    frontier: Sequence[str],
+    words: Set[str],
+    visited: Set[str],
+    index: Optional[Index] = None,
+) -> List[Set[str]]:
+    """
+    adjacent_words() of every word of a BFS frontier, in one batch when the
+    index can do that, as hamming_index.HammingIndex does.
+
+    >>> from hamming_index import HammingIndex
+    >>> words = {"hot", "dot", "dog", "lot", "log", "cog"}
+    >>> [sorted(r) for r in frontier_words(["dot", "lot"], words, {"hot"}, HammingIndex(words))]
+    [['dog', 'lot'], ['dot', 'log']]
+    """
+    adjacent_many = getattr(index, "adjacent_many", None)
+    if adjacent_many is None:
+        return [adjacent_words(word, words, visited, index) for word in frontier]
+    return [r - visited for r in adjacent_many(frontier)]
+
+
 Graph = Dict[str, Set[str]]
-Step = Graph
 
 
-def graph_to_str(g: Optional[Graph]):
+def graph_to_str(g: Optional[Mapping[str, Set[str]]]):
     """
     >>> graph_to_str(None)
     ''
@@ -58,82 +252,372 @@ def graph_to_str(g: Optional[Graph]):
         return ""
 
 
-def merge_graphs(g: Sequence[Graph]) -> Graph:
+def find_path_backward(
+    start_word: str,
+    end_word: str,
+    words: Set[str],
+    index: Optional[Index] = None,
+    scan: bool = False,
+) -> Optional[Graph]:
     """
-    >>> merge_graphs([])
-    {}
-
-    >>> graph_to_str(merge_graphs([{'a': {'a'}}]))
-    "{'a': {'a'}}"
-
-    >>> graph_to_str(merge_graphs([{'a': 'a'}, {'b': 'b'}]))
-    "{'a': {'a'}, 'b': {'b'}}"
-
-    >>> graph_to_str(merge_graphs([{'a': 'a', 'b': 'c'}, {'b': 'b'}]))
-    "{'a': {'a'}, 'b': {'b', 'c'}}"
+    Breadth first search from start_word until end_word is reached, returning
+    the parents of every word found: its neighbours one level closer to
+    start_word.  Neighbours come from index, built from words if not given,
+    or with scan=True from the original scan of every word.
 
+    >>> graph_to_str(find_path_backward("hit", "cog", {"hot","dot","dog","lot","log", "cog"}))
+    "{'cog': {'dog', 'log'}, 'dog': {'dot'}, 'dot': {'hot'}, 'hot': {'hit'}, 'log': {'lot'}, 'lot': {'hot'}}"
     """
-    merged: Graph = {}
-    for s in g:
-        for k, w in s.items():
-            if merged.get(k) is None:
-                merged[k] = set()
-            merged[k].update(w)
-
-    return merged
-
-
-def find_path_backward(start_word: str, end_word: str, words: Set[str]):
+    if not scan and index is None:
+        index = PatternIndex(words)
 
     visited: Set[str] = {start_word}
-    steps: List[Step] = [{start_word: set()}]
+    parents: Graph = {}
+    current_words: Set[str] = {start_word}
 
     while True:
         next_words: Set[str] = set()
-        for current_word in steps[-1]:
-            current_word_next_words = adjacent_words(current_word, words, visited)
-            steps[-1][current_word] = current_word_next_words
-            next_words = next_words.union(current_word_next_words)
+        frontier = list(current_words)
+        for current_word, neighbours in zip(
+            frontier, frontier_words(frontier, words, visited, index)
+        ):
+            for next_word in neighbours:
+                parents.setdefault(next_word, set()).add(current_word)
+                next_words.add(next_word)
         visited.update(next_words)
-        steps.append({word: set() for word in next_words})
 
         if end_word in next_words:
             break
 
         if next_words == set():
-            return
+            return None
+
+        current_words = next_words
 
-    return steps
+    return parents
 
 
-def used_words(graph: Graph, nn: Set[str]):
+def find_path_forward(parents: Graph, end_word: str) -> Graph:
     """
-    >>> used_words({'a': {'b', 'c'}}, {'b'})
-    {'a': {'b'}}
+    The shortest-path graph, swept back from end_word through the parents
+    find_path_backward() recorded; each word and edge on a shortest path is
+    visited once.
+
+    >>> graph_to_str(find_path_forward({'c': {'b'}, 'b': {'a'}, 'x': {'a'}}, 'c'))
+    "{'a': {'b'}, 'b': {'c'}, 'c': {}}"
+    """
+    graph: Graph = {end_word: set()}
+    current_words: List[str] = [end_word]
+    while current_words:
+        previous_words: List[str] = []
+        for word in current_words:
+            for parent in parents.get(word, ()):
+                if parent not in graph:
+                    graph[parent] = set()
+                    previous_words.append(parent)
+                graph[parent].add(word)
+        current_words = previous_words
+
+    return graph
+
+
+class Dag(Mapping[str, Set[str]]):
+    """
+    A shortest-path graph over the ids of an IdGraph, in CSR form: ids
+    holds its graph ids, sorted, and the successors of ids[p] are the ids
+    at the positions targets[offsets[p]:offsets[p + 1]].  A root word
+    outside the graph takes id -1.  It reads like a Graph but only turns
+    ids into words when looked at.
     """
-    return {
-        word: graph[word].intersection(nn)
-        for word, s in graph.items()
-        if len(s.intersection(nn)) > 0
-    }
 
-def find_path_forward(graph: Graph, end_word: str):
-    new_graph: Graph = {end_word: graph[end_word]}
-    prev_step_words: Set[str] = {end_word}
-    while True:
-        step_used_words: Graph = used_words(graph, prev_step_words)
-        new_graph = merge_graphs([new_graph, step_used_words])
-        prev_step_words = set(step_used_words.keys())
-        if prev_step_words == set():
-            break
-    
-    return new_graph
+    def __init__(
+        self,
+        graph: IdGraph,
+        ids: array,
+        offsets: array,
+        targets: array,
+        root_word: Optional[str] = None,
+    ) -> None:
+        self.graph = graph
+        self.ids = ids
+        self.offsets = offsets
+        self.targets = targets
+        self.root_word = root_word
+
+    def _word(self, position: int) -> str:
+        id = self.ids[position]
+        return self.graph.word(id) if id >= 0 else cast(str, self.root_word)
+
+    def _position(self, word: str) -> int:
+        id = self.graph.id(word)
+        if id is None and word == self.root_word:
+            id = -1
+        i = bisect_left(self.ids, id) if id is not None else len(self.ids)
+        if i == len(self.ids) or self.ids[i] != id:
+            raise KeyError(word)
+        return i
+
+    def __getitem__(self, word: str) -> Set[str]:
+        i = self._position(word)
+        return {
+            self._word(j) for j in self.targets[self.offsets[i] : self.offsets[i + 1]]
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._word(i) for i in range(len(self.ids)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def from_edges(
+        graph: IdGraph,
+        edges: Sequence[Tuple[int, int]],
+        root_word: Optional[str] = None,
+    ) -> "Dag":
+        """
+        >>> graph = WordGraph({"hot", "dot", "lot"})
+        >>> graph_to_str(Dag.from_edges(graph, [(-1, 1), (1, 0), (1, 2)], "hit"))
+        "{'dot': {}, 'hit': {'hot'}, 'hot': {'dot', 'lot'}, 'lot': {}}"
+        """
+        ids = array("i", sorted({id for edge in edges for id in edge}))
+        position = {id: p for p, id in enumerate(ids)}
+        successors: List[List[int]] = [[] for _ in ids]
+        for id, next_id in edges:
+            successors[position[id]].append(position[next_id])
+
+        offsets = array("I", [0])
+        targets = array("I")
+        for s in successors:
+            targets.extend(sorted(s))
+            offsets.append(len(targets))
+        return Dag(graph, ids, offsets, targets, root_word)
+
+    def paths(self, start: str, end: str) -> Iterator[List[str]]:
+        """
+        iter_paths() over positions, turning them into words per path; ids
+        are in word order, so the paths come out in lexicographic order.
+        """
+        start_position, end_position = self._position(start), self._position(end)
+        path = [start_position]
+        branches = [
+            iter(
+                self.targets[
+                    self.offsets[start_position] : self.offsets[start_position + 1]
+                ]
+            )
+        ]
+        while branches:
+            if path[-1] == end_position:
+                yield [self._word(i) for i in path]
+            i = next(branches[-1], None)
+            if i is None:
+                branches.pop()
+                path.pop()
+            else:
+                path.append(i)
+                branches.append(
+                    iter(self.targets[self.offsets[i] : self.offsets[i + 1]])
+                )
+
+
+def bfs_levels(graph: IdGraph, root_word: str, stop: Optional[int] = None) -> array:
+    """
+    Breadth first levels of every id reachable from root_word, which need
+    not be in graph (-1 where unreachable), ending early once the level
+    holding stop is complete.
+
+    >>> graph = WordGraph({"hot","dot","dog","lot","log", "cog"})
+    >>> bfs_levels(graph, "hit").tolist()
+    [4, 3, 2, 1, 3, 2]
+    >>> bfs_levels(graph, "hit", stop=graph.id("dot")).tolist()
+    [-1, -1, 2, 1, -1, 2]
+    """
+    root_id = graph.id(root_word)
+    levels = array("i", [-1]) * len(graph)
+    if root_id is not None:
+        levels[root_id] = 0
+    frontier = [i for i in graph.adjacent_ids(root_word) if i != root_id]
+    for i in frontier:
+        levels[i] = 1
+    level = 1
+    while frontier and (stop is None or levels[stop] < 0):
+        level += 1
+        next_frontier = []
+        for i in frontier:
+            for j in graph.neighbours(i):
+                if levels[j] < 0:
+                    levels[j] = level
+                    next_frontier.append(j)
+        frontier = next_frontier
+    return levels
+
+
+def sweep_levels(
+    graph: IdGraph, levels: array, target_id: int
+) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    Edges (nearer, farther) of the shortest paths from the BFS root to
+    target_id, swept back from target_id taking at each level the
+    neighbours one level nearer, and the ids next to the root where the
+    sweep ended.
+    """
+    edges: List[Tuple[int, int]] = []
+    layer = [target_id]
+    on_path = {target_id}
+    for level in range(levels[target_id], 1, -1):
+        nearer = []
+        for i in layer:
+            for j in graph.neighbours(i):
+                if levels[j] == level - 1:
+                    edges.append((j, i))
+                    if j not in on_path:
+                        on_path.add(j)
+                        nearer.append(j)
+        layer = nearer
+    return edges, layer
+
+
+def shortest_path_dag(
+    graph: IdGraph, start_word: str, end_word: str, levels: Optional[array] = None
+) -> Optional[Dag]:
+    """
+    find_shortest_path() over integer ids: a breadth first search that only
+    keeps a level per id, then a sweep back from end_word.  start_word
+    need not be in graph.  levels may be a complete bfs_levels() from
+    start_word shared by several queries.
 
+    >>> dag = shortest_path_dag(WordGraph({"hot","dot","dog","lot","log", "cog"}), "hit", "cog")
+    >>> graph_to_str(dag)
+    "{'cog': {}, 'dog': {'cog'}, 'dot': {'dog'}, 'hit': {'hot'}, 'hot': {'dot', 'lot'}, 'log': {'cog'}, 'lot': {'log'}}"
+    >>> list(dag.paths("hit", "cog"))
+    [['hit', 'hot', 'dot', 'dog', 'cog'], ['hit', 'hot', 'lot', 'log', 'cog']]
+    >>> shortest_path_dag(WordGraph({"hot","dot","dog","lot","log"}), "hit", "cog") is None
+    True
+    """
+    end_id = graph.id(end_word)
+    if end_id is None or start_word == end_word:
+        return None
+    if levels is None:
+        levels = bfs_levels(graph, start_word, stop=end_id)
+    if levels[end_id] < 0:
+        return None
 
-def find_shortest_path(
-    start_word: str, end_word: str, words: Set[str]
+    edges, first = sweep_levels(graph, levels, end_id)
+    start_id = graph.id(start_word)
+    root = -1 if start_id is None else start_id
+    return Dag.from_edges(graph, [(root, i) for i in first] + edges, start_word)
+
+
+def find_path_bidirectional(
+    start_word: str,
+    end_word: str,
+    words: Set[str],
+    index: Optional[Index] = None,
+    scan: bool = False,
 ) -> Optional[Graph]:
     """
+    The graph find_shortest_path() returns, searched from both ends: each
+    round grows the smaller frontier by one level until the two meet, then
+    the shortest paths are swept outwards from the words where they met.
+
+    >>> graph_to_str(find_path_bidirectional("hit", "cog", {"hot","dot","dog","lot","log", "cog"}))
+    "{'cog': {}, 'dog': {'cog'}, 'dot': {'dog'}, 'hit': {'hot'}, 'hot': {'dot', 'lot'}, 'log': {'cog'}, 'lot': {'log'}}"
+
+    >>> graph_to_str(find_path_bidirectional("hit", "cog", {"hot","dot","dog","lot","log"}))
+    ''
+    """
+    if not scan and index is None:
+        index = PatternIndex(words)
+    if start_word == end_word or end_word not in words:
+        return None
+
+    def neighbours(word: str) -> Set[str]:
+        # start_word need not be in words, but ladders begin there.
+        r = adjacent_words(word, words, set(), index)
+        if is_next_word_for(word, start_word):
+            r.add(start_word)
+        return r
+
+    forward: Dict[str, int] = {start_word: 0}
+    backward: Dict[str, int] = {end_word: 0}
+    forward_frontier: Set[str] = {start_word}
+    backward_frontier: Set[str] = {end_word}
+    forward_depth = backward_depth = 0
+    length: Optional[int] = None
+
+    while length is None:
+        if not forward_frontier or not backward_frontier:
+            return None
+        grow_forward = len(forward_frontier) <= len(backward_frontier)
+        distances, others = (forward, backward) if grow_forward else (backward, forward)
+        frontier = forward_frontier if grow_forward else backward_frontier
+        depth = (forward_depth if grow_forward else backward_depth) + 1
+
+        next_frontier: Set[str] = set()
+        for word in frontier:
+            for next_word in neighbours(word):
+                if next_word not in distances:
+                    distances[next_word] = depth
+                    next_frontier.add(next_word)
+        met = [depth + others[word] for word in next_frontier if word in others]
+        if met:
+            length = min(met)
+
+        if grow_forward:
+            forward_frontier, forward_depth = next_frontier, depth
+        else:
+            backward_frontier, backward_depth = next_frontier, depth
+
+    # Words on shortest paths at split are known from both sides; sweep
+    # back to start_word through forward levels and on to end_word
+    # through backward levels.
+    split = max(0, length - backward_depth)
+    layer = {
+        word
+        for word, d in forward.items()
+        if d == split and backward.get(word) == length - split
+    }
+    graph: Graph = {word: set() for word in layer}
+
+    current = layer
+    for d in range(split - 1, -1, -1):
+        previous: Set[str] = set()
+        for word in current:
+            for prev_word in neighbours(word):
+                if forward.get(prev_word) == d:
+                    graph.setdefault(prev_word, set()).add(word)
+                    previous.add(prev_word)
+        current = previous
+
+    current = layer
+    for d in range(length - split - 1, -1, -1):
+        following: Set[str] = set()
+        for word in current:
+            for next_word in neighbours(word):
+                if backward.get(next_word) == d:
+                    graph[word].add(next_word)
+                    graph.setdefault(next_word, set())
+                    following.add(next_word)
+        current = following
+
+    return graph
+
+
+def find_shortest_path(
+    start_word: str,
+    end_word: str,
+    words: Set[str],
+    index: Optional[Index] = None,
+    scan: bool = False,
+    bidirectional: bool = False,
+) -> Optional[Mapping[str, Set[str]]]:
+    """
+    The shortest-path graph from start_word to end_word.  Unless scan,
+    bidirectional or a string index is asked for, the search runs over
+    integer ids (index may be a WordGraph or WordIndex built beforehand)
+    and returns a Dag.
+
     >>> graph_to_str(find_shortest_path("a", "b", {"a", "b"}))
     "{'a': {'b'}, 'b': {}}"
 
@@ -145,23 +629,58 @@ def find_shortest_path(
 
     >>> graph_to_str(find_shortest_path("hit", "cog", {"hot","dot","dog","lot","log"}))
     ''
+
+    The pattern index and the scan find the same graph:
+
+    >>> test_data = json.load(open("large.json"))
+    >>> words = set(test_data["list"])
+    >>> find_shortest_path("cet", "ism", words) == find_shortest_path("cet", "ism", words, scan=True)
+    True
+
+    and so do the bidirectional search and the string pipeline:
+
+    >>> find_shortest_path("cet", "ism", words) == find_shortest_path("cet", "ism", words, bidirectional=True)
+    True
+    >>> find_shortest_path("cet", "ism", words) == find_shortest_path("cet", "ism", words, PatternIndex(words))
+    True
     """
+    if bidirectional:
+        return find_path_bidirectional(start_word, end_word, words, index, scan)
 
-    steps = find_path_backward(start_word, end_word, words)
-    if steps is None:
-        return None
+    id_graph = _id_graph(words, index, scan)
+    if id_graph is not None:
+        return shortest_path_dag(id_graph, start_word, end_word)
 
-    new_steps = find_path_forward(merge_graphs(steps), end_word)
+    parents = find_path_backward(start_word, end_word, words, index, scan)
+    if parents is None:
+        return None
 
-    return new_steps
+    return find_path_forward(parents, end_word)
 
 
-def shortest_ladders(start_word: str, end_word: str, word_list: Set[str]):
+def _id_graph(words: Set[str], index: Optional[Index], scan: bool) -> Optional[IdGraph]:
+    if scan:
+        return None
+    if index is None:
+        return WordGraph(words)
+    if hasattr(index, "adjacent_ids"):
+        return cast(IdGraph, index)
+    return None
+
+
+def shortest_ladders(
+    start_word: str,
+    end_word: str,
+    word_list: Set[str],
+    index: Optional[Index] = None,
+    scan: bool = False,
+    bidirectional: bool = False,
+):
     """
     # >>> print(shortest_ladders("hit", "cog", {"hot","dot","dog","lot","log", "cog"}))
     # [['hit', 'hot', 'dot', 'dog', 'cog'], ['hot', 'lot', 'log', 'cog']]
     """
-    g = find_shortest_path(start_word, end_word, word_list)
+    g = find_shortest_path(start_word, end_word, word_list, index, scan, bidirectional)
 
     if g is not None:
         a = g
@@ -176,7 +695,198 @@ def shortest_ladders(start_word: str, end_word: str, word_list: Set[str]):
         #             dot.edge(word, next)
 
         # dot.render("round-table.gv")
-        return list(all_paths(a, start_word, end_word))
+        if isinstance(a, Dag):
+            return list(a.paths(start_word, end_word))
+        return list(iter_paths(a, start_word, end_word))
+
+
+def shortest_ladder_one(
+    start_word: str,
+    end_word: str,
+    words: Set[str],
+    index: Optional[Index] = None,
+) -> Optional[List[str]]:
+    """
+    One shortest ladder, found by A* with the Hamming distance to end_word
+    as the heuristic; it never overestimates, since a step changes one
+    letter, so the first time end_word is reached the ladder is optimal.
+
+    >>> shortest_ladder_one("hit", "cog", {"hot","dot","dog","lot","log", "cog"})
+    ['hit', 'hot', 'dot', 'dog', 'cog']
+    >>> shortest_ladder_one("hit", "cog", {"hot","dot","dog","lot","log"}) is None
+    True
+
+    >>> test_data = json.load(open("xlarge.json"))
+    >>> ladder = shortest_ladder_one(test_data["start"], test_data["end"], set(test_data["list"]))
+    >>> ladder in shortest_ladders(test_data["start"], test_data["end"], set(test_data["list"]))
+    True
+    """
+    if start_word == end_word or end_word not in words:
+        return None
+    if index is None:
+        index = PatternIndex(words)
+
+    parents: Dict[str, Optional[str]] = {start_word: None}
+    steps: Dict[str, int] = {start_word: 0}
+    # Ties on estimated length go to the deeper word, then alphabetically.
+    queue: List[Tuple[int, int, str]] = [(hamming(start_word, end_word), 0, start_word)]
+    while queue:
+        _, negative_steps, word = heapq.heappop(queue)
+        if -negative_steps > steps[word]:
+            continue
+        if word == end_word:
+            ladder = [word]
+            while parents[ladder[-1]] is not None:
+                ladder.append(cast(str, parents[ladder[-1]]))
+            return ladder[::-1]
+        next_steps = steps[word] + 1
+        for next_word in index.adjacent(word):
+            if next_steps < steps.get(next_word, next_steps + 1):
+                steps[next_word] = next_steps
+                parents[next_word] = word
+                heapq.heappush(
+                    queue,
+                    (next_steps + hamming(next_word, end_word), -next_steps, next_word),
+                )
+    return None
+
+
+def count_shortest_ladders(
+    start_word: str,
+    end_word: str,
+    word_list: Set[str],
+    index: Optional[Index] = None,
+    scan: bool = False,
+    bidirectional: bool = False,
+) -> int:
+    """
+    >>> count_shortest_ladders("hit", "cog", {"hot","dot","dog","lot","log", "cog"})
+    2
+    >>> count_shortest_ladders("hit", "cog", {"hot","dot","dog","lot","log"})
+    0
+    """
+    g = find_shortest_path(start_word, end_word, word_list, index, scan, bidirectional)
+    return 0 if g is None else count_paths(g, start_word, end_word)
+
+
+def iter_shortest_ladders(
+    start_word: str,
+    end_word: str,
+    word_list: Set[str],
+    index: Optional[Index] = None,
+    scan: bool = False,
+    bidirectional: bool = False,
+) -> Iterator[List[str]]:
+    """
+    Shortest ladders in lexicographic order, one at a time.
+
+    >>> from itertools import islice
+    >>> list(islice(iter_shortest_ladders("hit", "cog", {"hot","dot","dog","lot","log", "cog"}), 1))
+    [['hit', 'hot', 'dot', 'dog', 'cog']]
+    """
+    g = find_shortest_path(start_word, end_word, word_list, index, scan, bidirectional)
+    if isinstance(g, Dag):
+        yield from g.paths(start_word, end_word)
+    elif g is not None:
+        yield from iter_paths(g, start_word, end_word)
+
+
+def count_paths(graph: Mapping[str, Set[str]], start: str, end: str) -> int:
+    """
+    Number of paths from start to end in an acyclic graph, counted from
+    end backwards without listing them.
+
+    >>> count_paths({'a': {'b', 'c'}, 'b': {'d'}, 'c': {'d'}, 'd': set()}, 'a', 'd')
+    2
+    """
+    return path_counts(graph, end).get(start, 0)
+
+
+def path_counts(graph: Mapping[str, Set[str]], end: str) -> Dict[str, int]:
+    """
+    Number of paths to end from every word of an acyclic graph.
+
+    >>> sorted(path_counts({'a': {'b', 'c'}, 'b': {'d'}, 'c': {'d'}, 'd': set()}, 'd').items())
+    [('a', 2), ('b', 1), ('c', 1), ('d', 1)]
+    """
+    counts: Dict[str, int] = {}
+    for word in graph:
+        stack = [word]
+        while stack:
+            current = stack[-1]
+            if current in counts:
+                stack.pop()
+                continue
+            pending = [w for w in graph[current] if w not in counts]
+            if pending:
+                stack.extend(pending)
+            else:
+                stack.pop()
+                counts[current] = (
+                    1 if current == end else sum(counts[w] for w in graph[current])
+                )
+    return counts
+
+
+def nth_path(
+    graph: Mapping[str, Set[str]],
+    start: str,
+    end: str,
+    n: int,
+    counts: Optional[Dict[str, int]] = None,
+) -> List[str]:
+    """
+    The n-th (from 0) path from start to end in lexicographic order, found
+    by skipping whole subtrees by their path counts.
+
+    >>> g = {'a': {'b', 'c'}, 'b': {'d', 'e'}, 'c': {'d'}, 'd': {'f'}, 'e': {'f'}, 'f': set()}
+    >>> [nth_path(g, 'a', 'f', n) for n in range(3)]
+    [['a', 'b', 'd', 'f'], ['a', 'b', 'e', 'f'], ['a', 'c', 'd', 'f']]
+    >>> nth_path(g, 'a', 'f', 3)
+    Traceback (most recent call last):
+    ...
+    IndexError: path 3 of 3
+    """
+    if counts is None:
+        counts = path_counts(graph, end)
+    total = counts.get(start, 0)
+    if not 0 <= n < total:
+        raise IndexError(f"path {n} of {total}")
+    path = [start]
+    while path[-1] != end:
+        for word in sorted(graph[path[-1]]):
+            if n < counts[word]:
+                path.append(word)
+                break
+            n -= counts[word]
+    return path
+
+
+def iter_paths(
+    graph: Mapping[str, Set[str]], start: str, end: str
+) -> Iterator[List[str]]:
+    """
+    Paths from start to end in lexicographic order, keeping only the
+    current path and its unexplored branches in memory.
+
+    >>> g = {'a': {'b', 'c'}, 'b': {'d', 'e'}, 'c': {'d'}, 'd': {'f'}, 'e': {'f'}, 'f': set()}
+    >>> list(iter_paths(g, 'a', 'f'))
+    [['a', 'b', 'd', 'f'], ['a', 'b', 'e', 'f'], ['a', 'c', 'd', 'f']]
+    >>> sorted(iter_paths(g, 'a', 'f')) == sorted(all_paths(g, 'a', 'f'))
+    True
+    """
+    path = [start]
+    branches = [iter(sorted(graph[start]))]
+    while branches:
+        if path[-1] == end:
+            yield list(path)
+        word = next(branches[-1], None)
+        if word is None:
+            branches.pop()
+            path.pop()
+        else:
+            path.append(word)
+            branches.append(iter(sorted(graph[word])))
 
 
 def all_paths(
@@ -193,7 +903,7 @@ def all_paths(
                 yield [start] + b
 
 
-def show_steps(steps: List[Step], words: Set[str]):
+def show_steps(steps: List[Graph], words: Set[str]):
     for w in words:
         l = w
         for i in steps:
@@ -0,0 +1,59 @@
+"""
+NumPy neighbour index for dictionaries of equal-length words, for callers
+that want whole BFS frontiers compared at once; find_ladders itself does
+not need NumPy.
+"""
+from typing import Iterable, List, Sequence, Set
+
+import numpy as np
+
+
+class HammingIndex:
+    """
+    A dictionary of equal-length words as an (N, L) uint8 matrix, finding
+    the words one letter away from a whole BFS frontier with batched array
+    comparisons.  Rows of the frontier are compared in chunks of at most
+    chunk_size cells, which bounds the temporary arrays.
+
+    >>> index = HammingIndex({"hot", "dot", "dog", "lot", "log", "cog"})
+    >>> index.matrix.shape
+    (6, 3)
+    >>> [sorted(r) for r in index.adjacent_many(["dot", "hit", "toolong"])]
+    [['dog', 'hot', 'lot'], ['hot'], []]
+
+    >>> import json
+    >>> from find_ladders import find_shortest_path
+    >>> test_data = json.load(open("large.json"))
+    >>> words = set(test_data["list"])
+    >>> find_shortest_path("cet", "ism", words, HammingIndex(words, chunk_size=1000)) == find_shortest_path("cet", "ism", words, scan=True)
+    True
+    """
+
+    def __init__(self, words: Iterable[str], chunk_size: int = 1 << 24) -> None:
+        self.words: List[str] = sorted(set(words))
+        self.chunk_size = chunk_size
+        self.length = len(self.words[0]) if self.words else 0
+        if any(len(word) != self.length for word in self.words):
+            raise ValueError("HammingIndex needs words of one length")
+        self.matrix = self._encode(self.words)
+
+    def _encode(self, words: Sequence[str]) -> np.ndarray:
+        data = "".join(words).encode("latin-1")
+        return np.frombuffer(data, dtype=np.uint8).reshape(len(words), self.length)
+
+    def adjacent_many(self, frontier: Sequence[str]) -> List[Set[str]]:
+        result: List[Set[str]] = [set() for _ in frontier]
+        rows = [i for i, word in enumerate(frontier) if len(word) == self.length]
+        if not rows or not self.words:
+            return result
+        encoded = self._encode([frontier[i] for i in rows])
+        step = max(1, self.chunk_size // self.matrix.size)
+        for begin in range(0, len(rows), step):
+            chunk = encoded[begin : begin + step]
+            hits = (chunk[:, None, :] != self.matrix[None]).sum(-1) == 1
+            for row, column in zip(*np.nonzero(hits)):
+                result[rows[begin + row]].add(self.words[column])
+        return result
+
+    def adjacent(self, word: str) -> Set[str]:
+        return self.adjacent_many([word])[0]
@@ -0,0 +1,223 @@
+"""
+Many ladder queries against one dictionary.
+
+A LadderSolver interns the dictionary once and answers batches of
+(start, end) queries.  Queries are grouped by the word most of them share,
+start or end, and each group is answered from one complete breadth first
+search from that word.  The levels of recent searches are kept, so later
+queries from the same word skip the search altogether.  Groups can be
+spread over forked worker processes, which inherit the solver
+copy-on-write instead of rebuilding or unpickling it.
+
+    python solver.py xlarge.json queries.txt --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+from array import array
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from find_ladders import (
+    Dag,
+    IdGraph,
+    WordGraph,
+    bfs_levels,
+    count_paths,
+    sweep_levels,
+)
+
+Query = Tuple[str, str]
+Ladders = Optional[List[List[str]]]
+
+
+class LadderSolver:
+    """
+    >>> solver = LadderSolver({"hot", "dot", "dog", "lot", "log", "cog"})
+    >>> solver.solve([("hit", "cog"), ("hit", "dot"), ("dog", "lot"), ("hit", "hit")])
+    [[['hit', 'hot', 'dot', 'dog', 'cog'], ['hit', 'hot', 'lot', 'log', 'cog']], [['hit', 'hot', 'dot']], [['dog', 'dot', 'lot'], ['dog', 'log', 'lot']], None]
+    >>> solver.count("hit", "cog"), solver.searches
+    (2, 2)
+
+    >>> test_data = json.load(open("large.json"))
+    >>> from find_ladders import shortest_ladders
+    >>> solver = LadderSolver(test_data["list"])
+    >>> queries = [("cet", "ism"), ("cet", "ibm"), ("ism", "cat"), ("inn", "cet")]
+    >>> solver.solve(queries, workers=2) == [shortest_ladders(s, e, set(test_data["list"])) for s, e in queries]
+    True
+    """
+
+    def __init__(self, words: Iterable[str], cache_size: int = 64) -> None:
+        self.graph: IdGraph = WordGraph(words)
+        self.cache_size = cache_size
+        self.searches = 0
+        self._levels: "OrderedDict[str, array]" = OrderedDict()
+
+    @staticmethod
+    def from_graph(graph: IdGraph, cache_size: int = 64) -> "LadderSolver":
+        """A solver over an existing id graph, such as a WordIndex."""
+        solver = LadderSolver([], cache_size)
+        solver.graph = graph
+        return solver
+
+    def levels(self, root_word: str) -> array:
+        """Complete bfs_levels() from root_word, from the cache when there."""
+        levels = self._levels.get(root_word)
+        if levels is not None:
+            self._levels.move_to_end(root_word)
+            return levels
+        self.searches += 1
+        levels = bfs_levels(self.graph, root_word)
+        self._levels[root_word] = levels
+        if len(self._levels) > self.cache_size:
+            self._levels.popitem(last=False)
+        return levels
+
+    def dag(
+        self, start_word: str, end_word: str, from_end: bool = False
+    ) -> Optional[Dag]:
+        """
+        The shortest-path graph, searched from start_word, or with from_end
+        from end_word; both give the same graph as the dictionary's
+        neighbour relation is symmetric.
+        """
+        graph = self.graph
+        start_id, end_id = graph.id(start_word), graph.id(end_word)
+        if end_id is None or start_word == end_word:
+            return None
+
+        if from_end and start_id is not None:
+            levels = self.levels(end_word)
+            if levels[start_id] < 0:
+                return None
+            edges, last = sweep_levels(graph, levels, start_id)
+            return Dag.from_edges(
+                graph, [(i, end_id) for i in last] + [(i, j) for j, i in edges]
+            )
+
+        levels = self.levels(start_word)
+        if levels[end_id] < 0:
+            return None
+        edges, first = sweep_levels(graph, levels, end_id)
+        root = -1 if start_id is None else start_id
+        return Dag.from_edges(graph, [(root, i) for i in first] + edges, start_word)
+
+    def ladders(
+        self, start_word: str, end_word: str, from_end: bool = False
+    ) -> Ladders:
+        dag = self.dag(start_word, end_word, from_end)
+        return None if dag is None else list(dag.paths(start_word, end_word))
+
+    def count(self, start_word: str, end_word: str) -> int:
+        dag = self.dag(start_word, end_word)
+        return 0 if dag is None else count_paths(dag, start_word, end_word)
+
+    def groups(self, queries: Sequence[Query]) -> List[Tuple[bool, List[int]]]:
+        """
+        Query positions grouped by shared start word, or by shared end word
+        when more queries share that, as (from_end, positions).
+
+        >>> LadderSolver(["ab", "ac", "ad", "ae"]).groups([("ab", "ac"), ("ad", "ac"), ("ae", "ac"), ("ab", "ae")])
+        [(True, [0, 1, 2]), (False, [3])]
+        """
+        starts: Dict[str, List[int]] = defaultdict(list)
+        ends: Dict[str, List[int]] = defaultdict(list)
+        for i, (start_word, end_word) in enumerate(queries):
+            starts[start_word].append(i)
+            ends[end_word].append(i)
+
+        groups: List[Tuple[bool, List[int]]] = []
+        assigned = [False] * len(queries)
+        for i, (start_word, end_word) in enumerate(queries):
+            if assigned[i]:
+                continue
+            # Searching from the end needs the start word in the dictionary.
+            from_end = (
+                len(ends[end_word]) > len(starts[start_word])
+                and self.graph.id(start_word) is not None
+            )
+            candidates = ends[end_word] if from_end else starts[start_word]
+            group = [
+                j
+                for j in candidates
+                if not assigned[j]
+                and (not from_end or self.graph.id(queries[j][0]) is not None)
+            ]
+            for j in group:
+                assigned[j] = True
+            groups.append((from_end, group))
+        return groups
+
+    def solve(
+        self, queries: Sequence[Query], workers: Optional[int] = None
+    ) -> List[Ladders]:
+        """
+        Shortest ladders for every (start, end) query, in query order; None
+        where there is no ladder.  With workers > 1 groups are answered in
+        forked worker processes.
+        """
+        queries = list(queries)
+        groups = self.groups(queries)
+        results: List[Ladders] = [None] * len(queries)
+        if workers is not None and workers > 1 and len(groups) > 1:
+            global _solver
+            _solver = self
+            try:
+                with ProcessPoolExecutor(
+                    workers, mp_context=multiprocessing.get_context("fork")
+                ) as executor:
+                    answers = executor.map(
+                        _solve_group,
+                        [
+                            (from_end, [queries[i] for i in group])
+                            for from_end, group in groups
+                        ],
+                    )
+                    for (_, group), group_answers in zip(groups, answers):
+                        for i, ladders in zip(group, group_answers):
+                            results[i] = ladders
+            finally:
+                _solver = None
+            return results
+
+        for from_end, group in groups:
+            for i in group:
+                results[i] = self.ladders(*queries[i], from_end=from_end)
+        return results
+
+
+# The solver forked workers inherit; set only while solve() runs a pool.
+_solver: Optional[LadderSolver] = None
+
+
+def _solve_group(group: Tuple[bool, List[Query]]) -> List[Ladders]:
+    assert _solver is not None
+    from_end, queries = group
+    return [
+        _solver.ladders(start_word, end_word, from_end)
+        for start_word, end_word in queries
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer many shortest ladder queries")
+    parser.add_argument("words", help='JSON file with a "list" of words')
+    parser.add_argument("queries", help="file with one 'start end' pair per line")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.words) as f:
+        solver = LadderSolver(json.load(f)["list"])
+    with open(args.queries) as f:
+        queries = [
+            (start, end) for start, end in (line.split() for line in f if line.strip())
+        ]
+    for (start, end), ladders in zip(queries, solver.solve(queries, args.workers)):
+        print(f"{start} {end}: {len(ladders) if ladders else 0} ladders")
+        for ladder in ladders or []:
+            print(ladder)
+
+
+if __name__ == "__main__":
+    main()
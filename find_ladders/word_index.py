@@ -0,0 +1,252 @@
+"""
+Word graph of a dictionary compiled to a flat binary file and memory-mapped
+at query time, so processes answering ladder queries against the same
+dictionary share one copy of it and skip rebuilding it.
+
+    python word_index.py build large.json large.idx
+    python word_index.py query large.idx cet ism
+
+The file is a header followed by little-endian uint32 arrays and utf-8
+blobs, each section padded to 4 bytes:
+
+    word offsets[n_words + 1], words            words sorted, id = position
+    adjacency offsets[n_words + 1], adjacency   CSR: neighbour ids per word
+    pattern offsets[n_patterns + 1], patterns   wildcard patterns, sorted
+    bucket offsets[n_patterns + 1], buckets     word ids per pattern
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import AbstractSet, Iterable, Iterator, List, Optional, Sequence, Set, Sized
+
+from find_ladders import PatternIndex, patterns, shortest_ladders
+
+MAGIC = b"WORDIDX1"
+_HEADER = struct.Struct("<8sIII")
+
+
+def _uint32s(values: Iterable[int]) -> bytes:
+    a = array("I", values)
+    assert a.itemsize == 4
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _padded(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _offsets(items: Sequence[Sized]) -> List[int]:
+    offsets = [0]
+    for item in items:
+        offsets.append(offsets[-1] + len(item))
+    return offsets
+
+
+def build(words: Iterable[str], path: str) -> None:
+    """
+    Compiles words into an index file at path.
+    """
+    encoded = sorted({word.encode("utf-8") for word in words})
+    ids = {word.decode("utf-8"): i for i, word in enumerate(encoded)}
+    buckets = PatternIndex(ids).buckets
+
+    adjacency: List[List[int]] = []
+    for word in ids:
+        neighbours = {
+            ids[next_word]
+            for pattern in patterns(word)
+            for next_word in buckets[pattern]
+            if next_word != word
+        }
+        adjacency.append(sorted(neighbours))
+    edges = [i for neighbours in adjacency for i in neighbours]
+
+    pattern_names = sorted(pattern.encode("utf-8") for pattern in buckets)
+    bucket_ids = [
+        [ids[word] for word in buckets[pattern.decode("utf-8")]]
+        for pattern in pattern_names
+    ]
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(encoded), len(edges), len(pattern_names)))
+        f.write(_uint32s(_offsets(encoded)))
+        f.write(_padded(b"".join(encoded)))
+        f.write(_uint32s(_offsets(adjacency)))
+        f.write(_uint32s(edges))
+        f.write(_uint32s(_offsets(pattern_names)))
+        f.write(_padded(b"".join(pattern_names)))
+        f.write(_uint32s(_offsets(bucket_ids)))
+        f.write(_uint32s(i for bucket in bucket_ids for i in bucket))
+
+
+class WordIndex(AbstractSet[str]):
+    """
+    A compiled dictionary: a read-only set of its words with the integer
+    id interface of WordGraph, so it can stand in for both the word set
+    and the index of find_ladders queries.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "words.idx")
+    >>> build({"hot", "dot", "dog", "lot", "log", "cog"}, path)
+    >>> index = WordIndex(path)
+    >>> len(index), "dog" in index, "hit" in index, index.id("dog"), index.word(1)
+    (6, True, False, 1, 'dog')
+    >>> sorted(index.adjacent("dot")), sorted(index.adjacent("hit"))
+    (['dog', 'hot', 'lot'], ['hot'])
+    >>> shortest_ladders("hit", "cog", index, index)
+    [['hit', 'hot', 'dot', 'dog', 'cog'], ['hit', 'hot', 'lot', 'log', 'cog']]
+    >>> index.close()
+
+    >>> test_data = json.load(open("large.json"))
+    >>> build(test_data["list"], path)
+    >>> with WordIndex(path) as index:
+    ...     shortest_ladders("cet", "ism", index, index) == shortest_ladders("cet", "ism", set(test_data["list"]))
+    True
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, n_words, n_edges, n_patterns = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a word index")
+        self._position = _HEADER.size
+
+        self._word_offsets = self._uint32s(n_words + 1)
+        self._words = self._bytes(self._word_offsets[-1])
+        self._adjacency_offsets = self._uint32s(n_words + 1)
+        self._adjacency = self._uint32s(n_edges)
+        self._pattern_offsets = self._uint32s(n_patterns + 1)
+        self._patterns = self._bytes(self._pattern_offsets[-1])
+        self._bucket_offsets = self._uint32s(n_patterns + 1)
+        self._buckets = self._uint32s(self._bucket_offsets[-1])
+
+    def _bytes(self, n: int) -> memoryview:
+        view = self._view[self._position : self._position + n]
+        self._position += n + (-n % 4)
+        return view
+
+    def _uint32s(self, n: int):
+        view = self._bytes(4 * n)
+        if sys.byteorder == "little":
+            return view.cast("I")
+        # Big-endian hosts pay for a swapped copy.
+        a = array("I", view.tobytes())
+        a.byteswap()
+        return a
+
+    def close(self) -> None:
+        for name in (
+            "_word_offsets",
+            "_words",
+            "_adjacency_offsets",
+            "_adjacency",
+            "_pattern_offsets",
+            "_patterns",
+            "_bucket_offsets",
+            "_buckets",
+        ):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "WordIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._word_offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.word(i) for i in range(len(self)))
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self.id(word) is not None
+
+    def word(self, id: int) -> str:
+        return str(
+            self._words[self._word_offsets[id] : self._word_offsets[id + 1]], "utf-8"
+        )
+
+    def id(self, word: str) -> Optional[int]:
+        return _find(self._words, self._word_offsets, word.encode("utf-8"))
+
+    def neighbours(self, id: int) -> List[int]:
+        return self._adjacency[
+            self._adjacency_offsets[id] : self._adjacency_offsets[id + 1]
+        ].tolist()
+
+    def bucket(self, pattern: str) -> List[int]:
+        i = _find(self._patterns, self._pattern_offsets, pattern.encode("utf-8"))
+        if i is None:
+            return []
+        return self._buckets[
+            self._bucket_offsets[i] : self._bucket_offsets[i + 1]
+        ].tolist()
+
+    def adjacent_ids(self, word: str) -> Iterable[int]:
+        id = self.id(word)
+        if id is not None:
+            return self.neighbours(id)
+        return {i for pattern in patterns(word) for i in self.bucket(pattern)}
+
+    def adjacent(self, word: str) -> Set[str]:
+        return {self.word(i) for i in self.adjacent_ids(word)}
+
+
+class _Keys:
+    """Sorted blob entries as a sequence of bytes, for bisect."""
+
+    def __init__(self, blob: memoryview, offsets) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].tobytes()
+
+
+def _find(blob: memoryview, offsets, key: bytes) -> Optional[int]:
+    keys = _Keys(blob, offsets)
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        return i
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and query word graph indexes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_command = commands.add_parser("build", help="compile a word list JSON file")
+    build_command.add_argument("words", help='JSON file with a "list" of words')
+    build_command.add_argument("index")
+    query_command = commands.add_parser("query", help="print the shortest ladders")
+    query_command.add_argument("index")
+    query_command.add_argument("start")
+    query_command.add_argument("end")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        with open(args.words) as f:
+            build(json.load(f)["list"], args.index)
+    else:
+        with WordIndex(args.index) as index:
+            for ladder in shortest_ladders(args.start, args.end, index, index) or []:
+                print(ladder)
+
+
+if __name__ == "__main__":
+    main()
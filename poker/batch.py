@@ -0,0 +1,221 @@
+"""
+Streams a poker.txt-style match file through the fast evaluator.
+
+The file is memory-mapped and cut into byte ranges that end on line
+boundaries; each range is parsed and scored by a worker process one
+block of whole lines at a time, so the file is never loaded whole.
+Results are merged in range order.
+
+    python batch.py poker.txt --workers 8 --histogram
+"""
+import argparse
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from poker import Cards, Category, InvalidCard, evaluate
+from profiling import ProfileSnapshot, Profiler
+
+CHUNK_SIZE = 1 << 24
+BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class BatchResult:
+    """
+    results is [ties, player 1 wins, player 2 wins], the same layout as
+    the poker.py main loop; histogram counts the category of each
+    player's hand when asked for, and profile breaks the time down into
+    parsing, ranking and comparing.
+    """
+
+    results: List[int]
+    histogram: Optional[Dict[Category, List[int]]] = None
+    profile: Optional[ProfileSnapshot] = field(default=None, compare=False, repr=False)
+    seconds: float = field(default=0.0, compare=False, repr=False)
+
+    @property
+    def deals(self) -> int:
+        return sum(self.results)
+
+    @property
+    def deals_per_second(self) -> float:
+        return self.deals / self.seconds if self.seconds else 0.0
+
+
+# (results, per-category [player 1, player 2] counts by category ordinal, profile)
+Counts = Tuple[List[int], Optional[List[List[int]]], Optional[ProfileSnapshot]]
+
+
+def split(path: str, chunk_size: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Byte ranges of roughly chunk_size that start and end on line boundaries.
+
+    >>> split("poker.txt", 10_000)
+    [(0, 10020), (10020, 20040), (20040, 30000)]
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    ranges: List[Tuple[int, int]] = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end == -1 else end + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _lines_before(mm: mmap.mmap, offset: int) -> int:
+    lines = 0
+    for pos in range(0, offset, BLOCK_SIZE):
+        lines += mm[pos : min(pos + BLOCK_SIZE, offset)].count(b"\n")
+    return lines
+
+
+def _run_range(args: Tuple[str, int, int, bool, bool]) -> Counts:
+    path, start, end, histogram, profile = args
+    profiler = Profiler() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        results, categories = _score_range(path, start, end, histogram, profiler)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    return results, categories, profiler.snapshot() if profiler is not None else None
+
+
+def _score_range(
+    path: str, start: int, end: int, histogram: bool, profiler: Optional[Profiler]
+) -> Tuple[List[int], Optional[List[List[int]]]]:
+    results = [0, 0, 0]
+    categories = [[0, 0] for _ in Category] if histogram else None
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        line = 1
+        pos = start
+        while pos < end:
+            stop = min(pos + BLOCK_SIZE, end)
+            if stop < end:
+                cut = mm.rfind(b"\n", pos, stop)
+                stop = cut + 1 if cut != -1 else (mm.find(b"\n", stop, end) + 1 or end)
+            block = mm[pos:stop]
+            started = time.perf_counter()
+            try:
+                codes = Cards.parse_deals(block, first_line=line)
+            except (InvalidCard, ValueError):
+                # Parse again to report the line number within the whole file.
+                Cards.parse_deals(block, first_line=line + _lines_before(mm, start))
+                raise
+            line += block.count(b"\n")
+            pos = stop
+
+            parsed = time.perf_counter()
+            strengths = [evaluate(codes[i : i + 5]) for i in range(0, len(codes), 5)]
+            ranked = time.perf_counter()
+            for i in range(0, len(strengths), 2):
+                s1, s2 = strengths[i], strengths[i + 1]
+                results[0 if s1 == s2 else 1 if s1 > s2 else 2] += 1
+                if categories is not None:
+                    categories[s1 >> 20][0] += 1
+                    categories[s2 >> 20][1] += 1
+            if profiler is not None:
+                deals = len(strengths) // 2
+                profiler.record("batch.parse", parsed - started, calls=deals)
+                profiler.record("batch.rank", ranked - parsed, calls=deals)
+                profiler.record("batch.compare", time.perf_counter() - ranked, calls=deals)
+    return results, categories
+
+
+def _merge(partials: Iterable[Counts], histogram: bool, profile: bool) -> BatchResult:
+    results = [0, 0, 0]
+    categories = [[0, 0] for _ in Category]
+    snapshot = ProfileSnapshot()
+    for part_results, part_categories, part_snapshot in partials:
+        results = [a + b for a, b in zip(results, part_results)]
+        if part_categories is not None:
+            categories = [[a + b for a, b in zip(x, y)] for x, y in zip(categories, part_categories)]
+        if part_snapshot is not None:
+            snapshot = snapshot + part_snapshot
+    return BatchResult(
+        results,
+        {category: counts for category, counts in zip(Category, categories)} if histogram else None,
+        snapshot if profile else None,
+    )
+
+
+def run(
+    path: str,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    histogram: bool = False,
+    profile: bool = False,
+) -> BatchResult:
+    """
+    >>> run("poker.txt", workers=1).results
+    [0, 376, 624]
+
+    >>> run("poker.txt", workers=2, chunk_size=4096) == run("poker.txt", workers=1)
+    True
+
+    >>> run("poker.txt", workers=1, histogram=True).histogram[Category.FLUSH]
+    [1, 1]
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "bad.txt")
+    >>> with open(path, "wb") as f:
+    ...     _ = f.write(open("poker.txt", "rb").read()[:300] + b"2C 3C 4C 5C 6C 7C 8C 9C TC 1C\\n")
+    >>> try:
+    ...     run(path, workers=1, chunk_size=100)
+    ... except InvalidCard as e:
+    ...     print(e)
+    Invalid card "1C" at line 11, column 28
+
+    >>> profile = run("poker.txt", workers=1, profile=True).profile
+    >>> profile["batch.rank"].calls, profile["Cards.parse_deals"].calls
+    (1000, 1)
+    """
+    started = time.perf_counter()
+    tasks = [(path, start, end, histogram, profile) for start, end in split(path, chunk_size)]
+    if workers == 1:
+        result = _merge(map(_run_range, tasks), histogram, profile)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            result = _merge(executor.map(_run_range, tasks), histogram, profile)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a file of poker deals")
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--histogram", action="store_true")
+    parser.add_argument("--profile", action="store_true", help="report where the time goes")
+    args = parser.parse_args()
+
+    result = run(
+        args.path,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        histogram=args.histogram,
+        profile=args.profile,
+    )
+    ties, player1, player2 = result.results
+    print(f"ties {ties}  player 1 {player1}  player 2 {player2}")
+    if result.histogram is not None:
+        for category, (hands1, hands2) in result.histogram.items():
+            print(f"{category.value:16} {hands1:12} {hands2:12}")
+    if result.profile is not None:
+        print(result.profile.report())
+    print(f"{result.deals_per_second:,.0f} deals/sec in {result.seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
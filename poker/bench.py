@@ -0,0 +1,247 @@
+"""
+Reproducible benchmarks for the poker evaluator.
+
+Deal files are generated with a seeded RNG in one of several hand
+distributions, then parsing, rank(), score() and winner() are timed per
+call and the batch runner is timed end to end.  Results are written as
+JSON and can be compared against a stored baseline:
+
+    python bench.py --sizes 1000 100000 --out baseline.json
+    python bench.py --sizes 1000 100000 --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Sequence
+
+import batch
+from poker import Cards, Hand, evaluate, rank, score, winner
+
+DISTRIBUTIONS = ["uniform", "flush", "pair"]
+LATENCY_SAMPLES = 10_000
+LINES_PER_BLOCK = 100
+MEMORY_SAMPLES = 1_000
+
+
+def _hand(rng: random.Random, deck: List[int], distribution: str) -> List[int]:
+    if distribution == "flush":
+        suit = rng.randrange(4)
+        return rng.sample([code for code in deck if code & 3 == suit], 5)
+    if distribution == "pair":
+        by_value = [[code for code in deck if code >> 2 == value] for value in range(13)]
+        pair = rng.sample(rng.choice([codes for codes in by_value if len(codes) >= 2]), 2)
+        rest = rng.sample([code for code in deck if code not in pair], 3)
+        return pair + rest
+    return rng.sample(deck, 5)
+
+
+def deals(n: int, distribution: str = "uniform", seed: int = 0) -> Iterable[str]:
+    """
+    >>> list(deals(2, seed=1))
+    ['4D TC JD AD 8H AS 6C 7H TH TS', '8S 9D 4S 2D 7C JS KD 9S JC 3D']
+    >>> all(len({card[0] for card in line.split()[5:]}) < 5 for line in deals(20, "pair"))
+    True
+    >>> all(len({card[1] for card in line.split()[:5]}) == 1 for line in deals(20, "flush"))
+    True
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution}")
+    rng = random.Random(f"{seed}:{distribution}")
+    for _ in range(n):
+        first = _hand(rng, list(range(52)), distribution)
+        second = _hand(rng, [code for code in range(52) if code not in first], distribution)
+        yield " ".join(repr(card) for card in Cards.from_codes(first + second))
+
+
+def generate(path: str, n: int, distribution: str = "uniform", seed: int = 0) -> None:
+    with open(path, "wt") as f:
+        for line in deals(n, distribution, seed):
+            f.write(line)
+            f.write("\n")
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """
+    >>> percentile([1.0, 2.0, 3.0, 4.0], 50)
+    2.0
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, int(round(p / 100 * len(sorted_values))) - 1)]
+
+
+def measure(f: Callable, inputs: Sequence, units: int = 1) -> Dict[str, float]:
+    """
+    Times f once per input, each input counting as units operations;
+    latency percentiles come from the first LATENCY_SAMPLES calls.  Peak
+    memory is traced in a separate pass over the first MEMORY_SAMPLES
+    inputs, so tracing does not skew the timings.
+    """
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for x in inputs[:LATENCY_SAMPLES]:
+        t = time.perf_counter()
+        f(x)
+        latencies.append(time.perf_counter() - t)
+    for x in inputs[LATENCY_SAMPLES:]:
+        f(x)
+    seconds = time.perf_counter() - started
+    latencies.sort()
+
+    tracemalloc.start()
+    for x in inputs[:MEMORY_SAMPLES]:
+        f(x)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ops_per_sec": len(inputs) * units / seconds if seconds else 0.0,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p90_us": percentile(latencies, 90) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "peak_kb": peak / 1024,
+    }
+
+
+def _batch_child(path: str, workers: int) -> None:
+    result = batch.run(path, workers=workers)
+    # ru_maxrss is in KB on Linux; this process and its workers lived only
+    # for this run, so their high-water marks are its own.
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    print(json.dumps({"ops_per_sec": result.deals_per_second, "peak_kb": float(peak)}))
+
+
+def measure_batch(path: str, workers: int = 1) -> Dict[str, float]:
+    """
+    Times batch.run() end to end in a fresh interpreter, so the peak memory
+    reported is that run's alone rather than the highest of the whole
+    benchmark session.
+
+    >>> stats = measure_batch("poker.txt")
+    >>> sorted(stats), stats["peak_kb"] > 0
+    (['ops_per_sec', 'peak_kb'], True)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, "-c", f"import bench; bench._batch_child({os.path.abspath(path)!r}, {workers!r})"],
+        cwd=here,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run_benchmarks(
+    sizes: Sequence[int],
+    distributions: Sequence[str],
+    workdir: str,
+    seed: int = 0,
+    workers: int = 1,
+    micro_limit: int = 100_000,
+) -> Dict[str, Dict[str, float]]:
+    """
+    >>> results = run_benchmarks([200], ["pair"], tempfile.mkdtemp())
+    >>> sorted(results)[:4]
+    ['pair/200/batch', 'pair/200/evaluate', 'pair/200/parse', 'pair/200/parse_deals']
+    >>> results["pair/200/batch"]["ops_per_sec"] > 0
+    True
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for distribution in distributions:
+        for n in sizes:
+            path = os.path.join(workdir, f"{distribution}-{n}-{seed}.txt")
+            if not os.path.exists(path):
+                generate(path, n, distribution, seed)
+            prefix = f"{distribution}/{n}"
+
+            with open(path, "rt") as f:
+                lines = [line for _, line in zip(range(micro_limit), f)]
+            hands = [Cards.from_string(line)[:5] for line in lines]
+            results[f"{prefix}/parse"] = measure(Cards.from_string, lines)
+            encoded = [line.encode("ascii") for line in lines]
+            blocks = [
+                b"".join(encoded[i : i + LINES_PER_BLOCK])
+                for i in range(0, len(encoded) - LINES_PER_BLOCK + 1, LINES_PER_BLOCK)
+            ]
+            results[f"{prefix}/parse_deals"] = measure(Cards.parse_deals, blocks, LINES_PER_BLOCK)
+            results[f"{prefix}/evaluate"] = measure(evaluate, [Cards.to_codes(cards) for cards in hands])
+            results[f"{prefix}/rank"] = measure(lambda cards: rank(Hand(cards)), hands)
+            results[f"{prefix}/score"] = measure(lambda cards: score(Hand(cards)), hands)
+            results[f"{prefix}/score_fast"] = measure(lambda cards: score(Hand(cards), fast=True), hands)
+            results[f"{prefix}/winner"] = measure(winner, lines)
+            results[f"{prefix}/winner_fast"] = measure(lambda line: winner(line, fast=True), lines)
+
+            results[f"{prefix}/batch"] = measure_batch(path, workers)
+    return results
+
+
+def regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = 0.1,
+) -> List[str]:
+    """
+    Benchmarks whose throughput fell more than tolerance below the baseline.
+
+    >>> regressions({"a": {"ops_per_sec": 85.0}, "b": {"ops_per_sec": 95.0}}, {"a": {"ops_per_sec": 100.0}, "b": {"ops_per_sec": 100.0}})
+    ['a: 85 ops/sec, baseline 100 (-15.0%)']
+    """
+    found = []
+    for name, stats in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None or not base.get("ops_per_sec"):
+            continue
+        change = stats["ops_per_sec"] / base["ops_per_sec"] - 1
+        if change < -tolerance:
+            found.append(
+                f"{name}: {stats['ops_per_sec']:.0f} ops/sec, baseline {base['ops_per_sec']:.0f} ({change:+.1%})"
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the poker evaluator")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--distributions", nargs="+", default=DISTRIBUTIONS, choices=DISTRIBUTIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="workers for the end-to-end batch run")
+    parser.add_argument("--workdir", default=None, help="where generated deal files are kept")
+    parser.add_argument("--out", default=None, help="write results as JSON")
+    parser.add_argument("--baseline", default=None, help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="poker-bench-")
+    results = run_benchmarks(args.sizes, args.distributions, workdir, args.seed, args.workers)
+
+    print(f"{'benchmark':32} {'ops/sec':>12} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'peak KB':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:32} {stats['ops_per_sec']:12,.0f} {stats.get('p50_us', 0):9.1f} "
+            f"{stats.get('p90_us', 0):9.1f} {stats.get('p99_us', 0):9.1f} {stats['peak_kb']:10,.0f}"
+        )
+
+    if args.out:
+        with open(args.out, "wt") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, "rt") as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Win/tie/loss equity of Hold'em hole cards against a partially known board.
+
+Boards are completed by exact enumeration when there are at most
+`exact_limit` completions and by seeded Monte-Carlo sampling otherwise.
+Work is cut into chunks that do not depend on the number of workers and
+their counts are merged in chunk order, so results are reproducible on
+any machine.
+
+    python equity.py "AH KH" "QS QD" --board "2H 7H 9C" --workers 4
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import combinations
+from math import comb
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from poker import Cards, _best_tables, evaluate_best_many
+
+SAMPLES_PER_CHUNK = 10_000
+
+
+@dataclass
+class Equity:
+    wins: int = 0
+    ties: int = 0
+    losses: int = 0
+    share: float = 0.0
+
+    @property
+    def equity(self) -> float:
+        total = self.wins + self.ties + self.losses
+        return self.share / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return f"Equity(wins={self.wins}, ties={self.ties}, losses={self.losses}, equity={self.equity:.4f})"
+
+
+@dataclass
+class EquityResult:
+    players: List[Equity]
+    boards: int
+    exact: bool
+    seconds: float = field(default=0.0, compare=False, repr=False)
+
+    @property
+    def hands_per_second(self) -> float:
+        hands = self.boards * len(self.players)
+        return hands / self.seconds if self.seconds else 0.0
+
+
+# (boards, [wins, ties, losses, share] per player) for one chunk of work.
+Counts = Tuple[int, List[List[float]]]
+
+
+def _init_worker() -> None:
+    _best_tables()
+
+
+def _count(holes: Sequence[Sequence[int]], board: Sequence[int], boards: Iterable[Sequence[int]]) -> Counts:
+    counts = [[0, 0, 0, 0.0] for _ in holes]
+    n = 0
+    for rest in boards:
+        n += 1
+        full = tuple(board) + tuple(rest)
+        strengths = evaluate_best_many([tuple(hole) + full for hole in holes])
+        best = max(strengths)
+        winners = strengths.count(best)
+        for player, s in enumerate(strengths):
+            c = counts[player]
+            if s < best:
+                c[2] += 1
+            elif winners == 1:
+                c[0] += 1
+                c[3] += 1.0
+            else:
+                c[1] += 1
+                c[3] += 1.0 / winners
+    return n, counts
+
+
+def _exact_chunk(args: Tuple[Sequence[Sequence[int]], Sequence[int], Sequence[int], int, int]) -> Counts:
+    holes, board, deck, first, k = args
+    if k == 0:
+        return _count(holes, board, [()])
+    return _count(
+        holes,
+        board,
+        ((deck[first],) + rest for rest in combinations(deck[first + 1 :], k - 1)),
+    )
+
+
+def _sample_chunk(args: Tuple[Sequence[Sequence[int]], Sequence[int], Sequence[int], int, int, int, int]) -> Counts:
+    holes, board, deck, k, samples, seed, chunk = args
+    rng = random.Random(f"{seed}:{chunk}")
+    return _count(holes, board, (rng.sample(deck, k) for _ in range(samples)))
+
+
+def _tasks(
+    holes: Sequence[Sequence[int]],
+    board: Sequence[int],
+    deck: Sequence[int],
+    exact: bool,
+    samples: int,
+    seed: int,
+) -> Iterator[Tuple]:
+    k = 5 - len(board)
+    if exact:
+        for first in range(len(deck) - k + 1 if k else 1):
+            yield holes, board, deck, first, k
+    else:
+        for chunk, start in enumerate(range(0, samples, SAMPLES_PER_CHUNK)):
+            yield holes, board, deck, k, min(SAMPLES_PER_CHUNK, samples - start), seed, chunk
+
+
+def equity(
+    holes: Sequence[str],
+    board: str = "",
+    dead: str = "",
+    samples: int = 100_000,
+    seed: int = 0,
+    exact_limit: int = 100_000,
+    workers: Optional[int] = None,
+) -> EquityResult:
+    """
+    >>> equity(["AH AD", "KS KC"], board="2C 7D 9H AS", workers=1)
+    EquityResult(players=[Equity(wins=44, ties=0, losses=0, equity=1.0000), Equity(wins=0, ties=0, losses=44, equity=0.0000)], boards=44, exact=True)
+
+    >>> equity(["AH KH", "AD KD"], board="2C 7S 9C 3S", workers=1).players
+    [Equity(wins=0, ties=44, losses=0, equity=0.5000), Equity(wins=0, ties=44, losses=0, equity=0.5000)]
+
+    >>> r = equity(["AH AD", "7C 2S"], samples=20_000, seed=1, workers=1)
+    >>> r.exact, r.boards, round(r.players[0].equity, 2)
+    (False, 20000, 0.88)
+    >>> r == equity(["AH AD", "7C 2S"], samples=20_000, seed=1, workers=2)
+    True
+
+    >>> equity(["AH AD", "AH KC"])
+    Traceback (most recent call last):
+    ...
+    ValueError: Duplicate cards
+    """
+    hole_codes = [tuple(Cards.codes_from_string(hole)) for hole in holes]
+    board_codes = tuple(Cards.codes_from_string(board))
+    dead_codes = tuple(Cards.codes_from_string(dead))
+    if any(len(hole) != 2 for hole in hole_codes):
+        raise ValueError("Every hand needs exactly two hole cards")
+    if len(board_codes) > 5:
+        raise ValueError("A board has at most five cards")
+    used = [code for hole in hole_codes for code in hole] + list(board_codes) + list(dead_codes)
+    if len(set(used)) != len(used):
+        raise ValueError("Duplicate cards")
+    deck = tuple(code for code in range(52) if code not in set(used))
+
+    k = 5 - len(board_codes)
+    exact = comb(len(deck), k) <= exact_limit
+    tasks = _tasks(hole_codes, board_codes, deck, exact, samples, seed)
+    run = _exact_chunk if exact else _sample_chunk
+
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker()
+        partials: Iterable[Counts] = map(run, tasks)
+        result = _merge(partials, len(holes))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            result = _merge(executor.map(run, tasks), len(holes))
+    boards, players = result
+    return EquityResult(players, boards, exact, time.perf_counter() - started)
+
+
+def _merge(partials: Iterable[Counts], n_players: int) -> Tuple[int, List[Equity]]:
+    boards = 0
+    players = [Equity() for _ in range(n_players)]
+    for n, counts in partials:
+        boards += n
+        for player, (wins, ties, losses, share) in zip(players, counts):
+            player.wins += int(wins)
+            player.ties += int(ties)
+            player.losses += int(losses)
+            player.share += share
+    return boards, players
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold'em equity calculator")
+    parser.add_argument("holes", nargs="+", help='hole cards, e.g. "AH KH"')
+    parser.add_argument("--board", default="", help="known board cards")
+    parser.add_argument("--dead", default="", help="cards known to be out of the deck")
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--exact-limit", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    result = equity(
+        args.holes,
+        board=args.board,
+        dead=args.dead,
+        samples=args.samples,
+        seed=args.seed,
+        exact_limit=args.exact_limit,
+        workers=args.workers,
+    )
+    print(f"{'exact' if result.exact else 'sampled'} over {result.boards} boards")
+    for hole, player in zip(args.holes, result.players):
+        print(f"{hole:8} {player.equity:7.2%}  win {player.wins}  tie {player.ties}  lose {player.losses}")
+    print(f"{result.hands_per_second:,.0f} hands/sec in {result.seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,28 @@
 """
->>> class TestEnum(OrderedEnum): 
+>>> class TestEnum(OrderedEnum):
 ...     ONE = "1"
-...     TWO = "2" 
-...     THREE = "3" 
+...     TWO = "2"
+...     THREE = "3"
 >>> TestEnum.ONE
 <TestEnum.ONE: '1'>
 >>> "1" in TestEnum
 True
 >>> "4" in TestEnum
 False
+>>> TestEnum.ONE in TestEnum
+True
+>>> [] in TestEnum
+False
+>>> TestEnum.ONE < TestEnum.THREE
+True
+>>> TestEnum.TWO >= TestEnum.THREE
+False
+>>> TestEnum.THREE.ordinal
+2
+>>> prev_value(TestEnum.TWO), prev_value(TestEnum.ONE)
+(<TestEnum.ONE: '1'>, <TestEnum.THREE: '3'>)
+>>> next_value(TestEnum.TWO), next_value(TestEnum.THREE)
+(<TestEnum.THREE: '3'>, <TestEnum.ONE: '1'>)
 """
 from enum import Enum, EnumMeta
 from typing import Any, TypeVar
@@ -18,44 +32,62 @@ T = TypeVar("T", bound="OrderedEnum")
 
 
 def prev_value(t: T) -> T:
-    return list(t.__class__)[list(t.__class__).index(t) - 1]
+    return t._prev_  # type: ignore
+
+
+def next_value(t: T) -> T:
+    return t._next_  # type: ignore
 
 
 class MyEnumMeta(EnumMeta):
+    """
+    Computes each member's ordinal and its predecessor and successor once,
+    when the enum class is created; both wrap around at the ends.
+    """
+
+    def __new__(metacls, *args: Any, **kwargs: Any):
+        cls = super().__new__(metacls, *args, **kwargs)
+        members = list(cls)  # type: ignore
+        for i, member in enumerate(members):
+            member._ordinal_ = i
+            member._prev_ = members[i - 1]
+            member._next_ = members[(i + 1) % len(members)]
+        return cls
+
     def __contains__(cls, item: Any) -> bool:
+        if isinstance(item, cls):
+            return True
         try:
-            cls(item)  # type: ignore
-        except ValueError:
+            return item in cls._value2member_map_
+        except TypeError:
             return False
-        else:
-            return True
 
 
 class OrderedEnum(Enum, metaclass=MyEnumMeta):
     """ """
 
+    @property
+    def ordinal(self) -> int:
+        return self._ordinal_  # type: ignore
+
     def __ge__(self, other: "OrderedEnum"):
         if self.__class__ is other.__class__:
-            values = [e.value for e in self.__class__]
-            return values.index(self.value) >= values.index(other.value)
+            return self._ordinal_ >= other._ordinal_  # type: ignore
         return NotImplemented
 
     def __gt__(self, other: "OrderedEnum"):
         if self.__class__ is other.__class__:
-            values = [e.value for e in self.__class__]
-            return values.index(self.value) > values.index(other.value)
+            return self._ordinal_ > other._ordinal_  # type: ignore
         return NotImplemented
 
     def __le__(self, other: "OrderedEnum"):
         if self.__class__ is other.__class__:
-            values = [e.value for e in self.__class__]
-            return values.index(self.value) <= values.index(other.value)
+            return self._ordinal_ <= other._ordinal_  # type: ignore
         return NotImplemented
 
     def __lt__(self, other: "OrderedEnum"):
         if self.__class__ is other.__class__:
-            values = [e.value for e in self.__class__]
-            return values.index(self.value) < values.index(other.value)
+            return self._ordinal_ < other._ordinal_  # type: ignore
         return NotImplemented
 
 
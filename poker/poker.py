@@ -1,7 +1,15 @@
-from itertools import groupby
-from dataclasses import dataclass
+import heapq
+import re
+from array import array
+from functools import lru_cache
+from itertools import combinations_with_replacement, groupby
+from operator import itemgetter
+from dataclasses import dataclass, field
 from typing import (
+    Any,
     Callable,
+    Dict,
+    Iterable,
     Iterator,
     List,
     Optional,
@@ -56,9 +64,17 @@ class Category(OrderedEnum):
 
 
 class InvalidCard(Exception):
-    def __init__(self, invalid_card: str):
-        super().__init__(f'Invalid card "{invalid_card}"')
+    def __init__(
+        self,
+        invalid_card: str,
+        line: Optional[int] = None,
+        column: Optional[int] = None,
+    ):
+        where = f" at line {line}, column {column}" if line is not None else ""
+        super().__init__(f'Invalid card "{invalid_card}"{where}')
         self.invalid_card = invalid_card
+        self.line = line
+        self.column = column
 
 
 @dataclass(order=True, frozen=True)
@@ -92,16 +108,35 @@ class Card:
         >>> Card.from_string("TH")
         TH
         """
-        if len(str) != 2:
-            raise InvalidCard(str)
-        suit_str = str[1]
-        if suit_str not in Suit:
-            raise InvalidCard(str)
-        value_str = str[0]
-        if value_str not in Value:
+        code = _CODE_BY_STRING.get(str)
+        if code is None:
             raise InvalidCard(str)
+        return _CARDS_BY_CODE[code]
+
+    @property
+    def code(self) -> int:
+        """
+        Compact encoding of the card: value ordinal * 4 + suit ordinal.
+        Codes run from 0 to 51 and order like cards do.
 
-        return Card(suit=Suit(suit_str), value=Value(value_str))
+        >>> Card.from_string("2C").code
+        0
+
+        >>> Card.from_string("TH").code
+        35
+        """
+        return self.value.ordinal * 4 + self.suit.ordinal
+
+    @staticmethod
+    def from_code(code: int) -> "Card":
+        """
+        >>> Card.from_code(35)
+        TH
+
+        >>> all(Card.from_code(card.code) == card for card in _CARDS_BY_CODE)
+        True
+        """
+        return _CARDS_BY_CODE[code]
 
     def __repr__(self) -> str:
         suit_str = self.suit.value
@@ -109,9 +144,52 @@ class Card:
         return f"{value_str}{suit_str}"
 
 
-@dataclass(order=True, frozen=True)
+_VALUES: List[Value] = list(Value)
+_SUITS: List[Suit] = list(Suit)
+_CARDS_BY_CODE: List[Card] = [Card(value, suit) for value in _VALUES for suit in _SUITS]
+_CODE_BY_STRING = {repr(card): code for code, card in enumerate(_CARDS_BY_CODE)}
+# Value and suit ordinals by byte, -1 for bytes that are neither.
+_VALUE_BY_BYTE = [-1] * 256
+_SUIT_BY_BYTE = [-1] * 256
+for _value in _VALUES:
+    _VALUE_BY_BYTE[ord(_value.value)] = _value.ordinal
+for _suit in _SUITS:
+    _SUIT_BY_BYTE[ord(_suit.value)] = _suit.ordinal
+_TOKEN = re.compile(rb"\S+")
+_CODE_BY_TOKEN = {
+    bytes([value, suit]): _VALUE_BY_BYTE[value] * 4 + _SUIT_BY_BYTE[suit]
+    for value in range(256)
+    for suit in range(256)
+    if _VALUE_BY_BYTE[value] >= 0 and _SUIT_BY_BYTE[suit] >= 0
+}
+
+
+@dataclass(frozen=True, eq=False)
 class Score:
     """
+    Scores compare and hash by key, the same packed int evaluate() returns
+    for the hand: the category ordinal above 4-bit ordinals of the values.
+
+    >>> score(Hand.from_string("TS TH 9D 9C AH")).key == strength(Cards.from_string("TS TH 9D 9C AH"))
+    True
+    >>> hex(Score(Category.ONE_PAIR, [Value.ACE, Value.ACE, Value.KING, Value.THREE, Value.TWO]).key)
+    '0x1ccb10'
+
+    Scores of other than five values are compared in full, not by key:
+
+    >>> high = [Value.ACE, Value.KING, Value.NINE, Value.SEVEN, Value.FIVE]
+    >>> Score(Category.HIGH_CARD, high + [Value.FOUR]) > Score(Category.HIGH_CARD, high + [Value.THREE])
+    True
+    >>> Score(Category.HIGH_CARD, high + [Value.FOUR]) == Score(Category.HIGH_CARD, high + [Value.THREE])
+    False
+    >>> score(Hand.from_string("3H 3D")) < score(Hand.from_string("3H 3D 2C"))
+    True
+    >>> Score(Category.HIGH_CARD, [Value.ACE]) == Score(Category.HIGH_CARD, [Value.ACE, Value.TWO])
+    False
+    >>> Score(Category.HIGH_CARD, [Value.ACE]) == "A"
+    False
+    >>> len({score(Hand.from_string("TS TH 9D 9C AH")), score(Hand.from_string("TD TC 9H 9S AD"))})
+    1
     >>> score(Hand.from_string("AH KH QH JH TH")) == score(Hand.from_string("AS KS QS JS TS"))
     True
     >>> score(Hand.from_string("KH QH JH TH 9H")) == score(Hand.from_string("KS QS JS TS 9S"))
@@ -135,14 +213,59 @@ class Score:
 
     category: Category
     highest_cards: List[Value]
+    key: int = field(init=False, repr=False)
 
-        
-
-
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "key", _pack(self.category, [v.ordinal for v in self.highest_cards])
+        )
 
+    def _keys(self, other: "Score") -> Tuple[Any, Any]:
+        # key holds exactly five values, zero padded; scores with other
+        # counts, from hands of other sizes, are compared in full.
+        if (len(self.highest_cards) == 5 and len(other.highest_cards) == 5) or (
+            self.category is Category.ROYAL_FLUSH and other.category is Category.ROYAL_FLUSH
+        ):
+            return self.key, other.key
+        return self._full_key(), other._full_key()
+
+    def _full_key(self) -> Tuple[int, List[int]]:
+        return self.category.ordinal, [v.ordinal for v in self.highest_cards]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Score):
+            return NotImplemented
+        key, other_key = self._keys(other)
+        return key == other_key
+
+    def __hash__(self) -> int:
+        # Equal scores have equal first five values, so equal keys.
+        return hash(self.key)
+
+    def __lt__(self, other: object) -> bool:
+        if not isinstance(other, Score):
+            return NotImplemented
+        key, other_key = self._keys(other)
+        return key < other_key
+
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, Score):
+            return NotImplemented
+        key, other_key = self._keys(other)
+        return key <= other_key
+
+    def __gt__(self, other: object) -> bool:
+        if not isinstance(other, Score):
+            return NotImplemented
+        key, other_key = self._keys(other)
+        return key > other_key
+
+    def __ge__(self, other: object) -> bool:
+        if not isinstance(other, Score):
+            return NotImplemented
+        key, other_key = self._keys(other)
+        return key >= other_key
 
-    
-    
     def __repr__(self) -> str:
         return f"{self.category.value},{[x.value for x in self.highest_cards]}"
 
@@ -167,6 +290,138 @@ class Cards:
             else []
         )
 
+    @staticmethod
+    def codes_from_string(str: str) -> array:
+        """
+        Parses cards straight into their codes, without building Card objects.
+
+        >>> Cards.codes_from_string("2C TH")
+        array('B', [0, 35])
+
+        >>> Cards.codes_from_string("")
+        array('B')
+
+        >>> Cards.codes_from_string("2C 1H")  # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+        ...
+        InvalidCard: Invalid card "1H"
+        """
+        codes = array("B")
+        for x in str.split():
+            code = _CODE_BY_STRING.get(x)
+            if code is None:
+                raise InvalidCard(x)
+            codes.append(code)
+        return codes
+
+    @staticmethod
+    def parse_deals(
+        data: bytes, cards_per_line: Optional[int] = 10, first_line: int = 1
+    ) -> array:
+        """
+        Card codes of every card in a buffer of deal lines, in order.  Blank
+        lines are skipped; with cards_per_line set, every other line must
+        hold exactly that many cards.  Well-formed buffers are converted
+        whole; anything else is rescanned through the byte tables to say
+        which line and column is wrong.
+
+        >>> Cards.parse_deals(b"2C 3D\\r\\n\\nTH AS\\n", cards_per_line=2)
+        array('B', [0, 5, 35, 50])
+
+        >>> try:
+        ...     Cards.parse_deals(b"2C 3D\\n4H 5X\\n", cards_per_line=2)
+        ... except InvalidCard as e:
+        ...     print(e, e.line, e.column)
+        Invalid card "5X" at line 2, column 4 2 4
+
+        Tabs separate cards like spaces do:
+
+        >>> try:
+        ...     Cards.parse_deals(b"2C\\t3D\\n4H 5X\\n", cards_per_line=2)
+        ... except InvalidCard as e:
+        ...     print(e, e.line, e.column)
+        Invalid card "5X" at line 2, column 4 2 4
+
+        >>> Cards.parse_deals(b"2C 3D 4H\\n", cards_per_line=2)
+        Traceback (most recent call last):
+        ...
+        ValueError: Line 1 has 3 cards, expected 2
+
+        >>> with open("poker.txt", "rb") as f:
+        ...     codes = Cards.parse_deals(f.read())
+        >>> with open("poker.txt") as f:
+        ...     codes == array("B", [code for line in f for code in Cards.codes_from_string(line)])
+        True
+        """
+        codes = array("B")
+        extend = codes.extend
+        code_of = _CODE_BY_TOKEN.__getitem__
+        try:
+            for line in data.split(b"\n"):
+                tokens = line.split()
+                if tokens and cards_per_line is not None and len(tokens) != cards_per_line:
+                    raise KeyError(line)
+                extend(map(code_of, tokens))
+        except KeyError:
+            return Cards._parse_deals_checked(data, cards_per_line, first_line)
+        return codes
+
+    @staticmethod
+    def _parse_deals_checked(
+        data: bytes, cards_per_line: Optional[int], first_line: int
+    ) -> array:
+        """
+        parse_deals() one byte at a time, to report where bad input is.
+        """
+        codes = array("B")
+        values = _VALUE_BY_BYTE
+        suits = _SUIT_BY_BYTE
+        for line_number, line in enumerate(data.split(b"\n"), first_line):
+            count = 0
+            # Split on the same whitespace as bytes.split() in parse_deals().
+            for match in _TOKEN.finditer(line):
+                token = match.group()
+                if len(token) != 2 or values[token[0]] < 0 or suits[token[1]] < 0:
+                    raise InvalidCard(
+                        token.decode("latin-1"), line_number, match.start() + 1
+                    )
+                codes.append(values[token[0]] * 4 + suits[token[1]])
+                count += 1
+            if count and cards_per_line is not None and count != cards_per_line:
+                raise ValueError(
+                    f"Line {line_number} has {count} cards, expected {cards_per_line}"
+                )
+        return codes
+
+    @staticmethod
+    def to_codes(hand: Iterable[Card]) -> Tuple[int, ...]:
+        """
+        >>> Cards.to_codes(Cards.from_string("2C TH"))
+        (0, 35)
+        """
+        return tuple(card.code for card in hand)
+
+    @staticmethod
+    def from_codes(codes: Iterable[int]) -> List[Card]:
+        """
+        >>> Cards.from_codes((0, 35))
+        [2C, TH]
+        """
+        return [_CARDS_BY_CODE[code] for code in codes]
+
+    @staticmethod
+    def mask(codes: Iterable[int]) -> int:
+        """
+        52-bit mask with one bit per card code.
+
+        >>> bin(Cards.mask((0, 35)))
+        '0b100000000000000000000000000000000001'
+        """
+        mask = 0
+        for code in codes:
+            mask |= 1 << code
+        return mask
+
     @staticmethod
     def values(hand: Union[Sequence[Card], Iterator[Card]]) -> List[Value]:
         """
@@ -241,12 +496,8 @@ class Hand:
     def __init__(self, cards: List[Card]):
         self.cards = list(sorted(cards))
 
-        self.sorted_by_suit = Cards.group_by(
-            list(sorted(self.cards)), lambda card: card.suit
-        )
-        self.sorted_by_value = Cards.group_by(
-            list(sorted(self.cards)), lambda card: card.value
-        )
+        self.sorted_by_suit = Cards.group_by(self.cards, lambda card: card.suit)
+        self.sorted_by_value = Cards.group_by(self.cards, lambda card: card.value)
 
     def __repr__(self) -> str:
         return str(self.cards)
@@ -317,10 +568,385 @@ def score_from_rank(rank:Rank):
     else:
         raise Exception(f"Unknown rank {rank}")
 
-def score(hand:Hand):
-    return score_from_rank(rank(hand))
+def _classify(hand: Hand) -> Tuple[Category, List[Tuple[Value, List[Card]]]]:
+    """
+    Category of a five card hand from one look at its value groups, suits
+    and value span, in the precedence order of the matchers in rank().
+    """
+    groups = hand.sorted_by_value
+    flush = hand.is_single_suit
+    if len(groups) == 5:
+        straight = groups[4][0].ordinal - groups[0][0].ordinal == 4
+        if flush and straight:
+            if groups[0][0] is Value.TEN:
+                return Category.ROYAL_FLUSH, groups
+            return Category.STRAIGHT_FLUSH, groups
+        if flush:
+            return Category.FLUSH, groups
+        if straight:
+            return Category.STRAIGHT, groups
+        return Category.HIGH_CARD, groups
+    shape = sorted((len(cards) for _, cards in groups), reverse=True)
+    if shape[0] == 4:
+        return Category.FOUR_OF_A_KIND, groups
+    if shape[0] == 3:
+        if shape[1] == 2:
+            return Category.FULL_HOUSE, groups
+        return Category.THREE_OF_A_KIND, groups
+    if shape[1] == 2:
+        return Category.TWO_PAIRS, groups
+    return Category.ONE_PAIR, groups
+
+
+def _score_from_classification(
+    category: Category, groups: List[Tuple[Value, List[Card]]]
+) -> Score:
+    if category is Category.ROYAL_FLUSH:
+        return Score(category, [])
+    values = [value for value, _ in groups]
+    if category is Category.STRAIGHT_FLUSH:
+        return Score(category, values[:1] + values[:0:-1])
+    if category is Category.STRAIGHT:
+        return Score(category, values)
+    if category is Category.FLUSH or category is Category.HIGH_CARD:
+        return Score(category, values[::-1])
+    by_count = sorted(groups, key=lambda group: (len(group[1]), group[0]), reverse=True)
+    return Score(category, [value for value, cards in by_count for _ in cards])
+
+
+def score(hand: Hand, fast: bool = False) -> Score:
+    """
+    >>> score(Hand.from_string("TS TH 9D 9C AH"))
+    TWO_PAIRS,['T', 'T', '9', '9', 'A']
+
+    >>> score(Hand.from_string("TS TH 9D 9C AH"), fast=True)
+    TWO_PAIRS,['T', 'T', '9', '9', 'A']
+    """
+    if fast:
+        return score_from_strength(strength(hand.cards))
+    if len(hand.cards) != 5:
+        return score_from_rank(rank_by_matchers(hand))
+    return _score_from_classification(*_classify(hand))
+
+
+# Lookup-table evaluator.
+#
+# The Score of a hand depends only on the multiset of its values and on
+# whether all cards share a suit, so every possible Score is precomputed
+# once and packed into an int: the category ordinal in bits 20 and up,
+# followed by the five Score values as 4-bit ordinals, highest first.
+# Packed strengths order exactly like the Scores they stand for.
+#
+# Flushes and hands of five distinct values are looked up by the 13-bit
+# mask of their values, hands with repeated values by the product of
+# one prime per value.  rank_by_matchers() stays the reference.
+
+_CATEGORIES: List[Category] = list(Category)
+_VALUE_PRIME = {
+    value: prime
+    for value, prime in zip(
+        _VALUES, [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+    )
+}
+_PRIMES = [_VALUE_PRIME[value] for value in _VALUES]
+_CODE_BIT = [1 << (code >> 2) for code in range(len(_CARDS_BY_CODE))]
+_CODE_PRIME = [_PRIMES[code >> 2] for code in range(len(_CARDS_BY_CODE))]
+
+
+def _pack(category: Category, values: Sequence[int]) -> int:
+    packed = category.ordinal
+    for i in range(5):
+        packed = (packed << 4) | (values[i] if i < len(values) else 0)
+    return packed
+
+
+def _strength_of_values(values: Tuple[int, ...], flush: bool) -> int:
+    """
+    Strength of a hand given its value ordinals in descending order.
+    """
+    counts: Dict[int, int] = {}
+    for v in values:
+        counts[v] = counts.get(v, 0) + 1
+    if len(counts) == 5:
+        straight = values[0] - values[4] == 4
+        if flush and straight:
+            if values[4] == Value.TEN.ordinal:
+                return _pack(Category.ROYAL_FLUSH, [])
+            return _pack(Category.STRAIGHT_FLUSH, values[4:] + values[:4])
+        if flush:
+            return _pack(Category.FLUSH, values)
+        if straight:
+            return _pack(Category.STRAIGHT, values[::-1])
+        return _pack(Category.HIGH_CARD, values)
+
+    groups = sorted(counts.items(), key=lambda vc: (vc[1], vc[0]), reverse=True)
+    ordered = [v for v, count in groups for _ in range(count)]
+    shape = tuple(count for _, count in groups)
+    category = {
+        (4, 1): Category.FOUR_OF_A_KIND,
+        (3, 2): Category.FULL_HOUSE,
+        (3, 1, 1): Category.THREE_OF_A_KIND,
+        (2, 2, 1): Category.TWO_PAIRS,
+        (2, 1, 1, 1): Category.ONE_PAIR,
+    }[shape]
+    return _pack(category, ordered)
+
+
+def _build_tables() -> Tuple[List[int], List[int], Dict[int, int]]:
+    flushes = [0] * (1 << len(_VALUES))
+    unique = [0] * (1 << len(_VALUES))
+    paired: Dict[int, int] = {}
+    for combination in combinations_with_replacement(
+        reversed(range(len(_VALUES))), 5
+    ):
+        if combination[0] == combination[4]:
+            continue
+        if len(set(combination)) == 5:
+            mask = sum(1 << v for v in combination)
+            flushes[mask] = _strength_of_values(combination, flush=True)
+            unique[mask] = _strength_of_values(combination, flush=False)
+        else:
+            product = 1
+            for v in combination:
+                product *= _PRIMES[v]
+            paired[product] = _strength_of_values(combination, flush=False)
+    return flushes, unique, paired
+
+
+_FLUSHES, _UNIQUE, _PAIRED = _build_tables()
+
+
+def strength(cards: Sequence[Card]) -> int:
+    """
+    Packed strength of a five card hand, ordered like its Score.
+
+    >>> strength(Cards.from_string("TS TH 9D 9C AH")) > strength(Cards.from_string("TS TH 7D 9C AH"))
+    True
+
+    >>> strength(Cards.from_string("TH JH QH KH AH")) == strength(Cards.from_string("AS KS QS JS TS"))
+    True
+
+    >>> import random
+    >>> rng = random.Random(0)
+    >>> deck = [Card(value, suit) for value in Value for suit in Suit]
+    >>> hands = [rng.sample(deck, 5) for _ in range(300)]
+    >>> hands += [rng.sample([card for card in deck if card.suit == Suit.H], 5) for _ in range(30)]
+    >>> all(score_from_strength(strength(hand)) == score_from_rank(rank_by_matchers(Hand(hand))) for hand in hands)
+    True
+    """
+    return evaluate([card.code for card in cards])
+
+
+def evaluate(codes: Sequence[int]) -> int:
+    """
+    Packed strength of a five card hand given as card codes.
+
+    >>> evaluate(Cards.codes_from_string("TS TH 9D 9C AH")) == strength(Cards.from_string("TS TH 9D 9C AH"))
+    True
+    """
+    c1, c2, c3, c4, c5 = codes
+    bits = _CODE_BIT
+    mask = bits[c1] | bits[c2] | bits[c3] | bits[c4] | bits[c5]
+    suit = c1 & 3
+    if suit == c2 & 3 and suit == c3 & 3 and suit == c4 & 3 and suit == c5 & 3:
+        return _FLUSHES[mask]
+    s = _UNIQUE[mask]
+    if s:
+        return s
+    primes = _CODE_PRIME
+    return _PAIRED[primes[c1] * primes[c2] * primes[c3] * primes[c4] * primes[c5]]
+
+
+def sort_hands(hands: Sequence[Sequence[int]]) -> List[int]:
+    """
+    Indices of hands of card codes, strongest first; ties keep input order.
+
+    >>> sort_hands([Cards.codes_from_string(h) for h in ["2C 3D 4H 5S 7C", "TS TH 9D 9C AH", "TD TC 9H 9S AD"]])
+    [1, 2, 0]
+    """
+    keys = [evaluate(codes) for codes in hands]
+    return sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+
+
+def leaderboard(hands: Sequence[Sequence[int]]) -> List[int]:
+    """
+    Place of each hand of card codes, 1 for the strongest; tied hands share
+    a place and the next place is skipped.
+
+    >>> leaderboard([Cards.codes_from_string(h) for h in ["2C 3D 4H 5S 7C", "TS TH 9D 9C AH", "TD TC 9H 9S AD"]])
+    [3, 1, 1]
+    """
+    places = [0] * len(hands)
+    position = 1
+    for group in showdown(hands):
+        for i in group:
+            places[i] = position
+        position += len(group)
+    return places
+
+
+def showdown(hands: Sequence[Sequence[int]]) -> List[List[int]]:
+    """
+    Indices of hands of card codes grouped by equal strength, strongest
+    group first; each hand is evaluated once.
+
+    >>> showdown([Cards.codes_from_string(h) for h in ["2C 3D 4H 5S 7C", "TS TH 9D 9C AH", "KS KH 2D 3C 4H", "TD TC 9H 9S AD"]])
+    [[1, 3], [2], [0]]
+    >>> showdown([])
+    []
+    """
+    keys = [evaluate(codes) for codes in hands]
+    groups: List[List[int]] = []
+    previous = None
+    for i in sorted(range(len(keys)), key=keys.__getitem__, reverse=True):
+        if keys[i] != previous:
+            groups.append([])
+            previous = keys[i]
+        groups[-1].append(i)
+    return groups
+
+
+def top_hands(hands: Iterable[Sequence[int]], k: int) -> List[int]:
+    """
+    Indices of the k strongest hands of card codes, strongest first and
+    ties in input order, holding no more than k hands at a time.
+
+    >>> top_hands((Cards.codes_from_string(h) for h in ["2C 3D 4H 5S 7C", "TS TH 9D 9C AH", "KS KH 2D 3C 4H", "TD TC 9H 9S AD"]), 2)
+    [1, 3]
+    """
+    strengths = ((i, evaluate(codes)) for i, codes in enumerate(hands))
+    return [i for i, _ in heapq.nlargest(k, strengths, key=itemgetter(1))]
+
+
+def score_from_strength(strength: int) -> Score:
+    """
+    >>> score_from_strength(strength(Cards.from_string("7C 6S 5S 4H 3H")))
+    STRAIGHT,['3', '4', '5', '6', '7']
+
+    >>> score_from_strength(strength(Cards.from_string("TH JH QH KH AH")))
+    ROYAL_FLUSH,[]
+    """
+    category = _CATEGORIES[strength >> 20]
+    if category is Category.ROYAL_FLUSH:
+        return Score(category, [])
+    return Score(
+        category, [_VALUES[(strength >> shift) & 0xF] for shift in (16, 12, 8, 4, 0)]
+    )
             
 
+# Best five of up to seven cards.
+#
+# A five card subset is either single-suited or its Score depends on its
+# values alone, and a flush never scores below the same values off-suit.
+# So the best subset is the larger of the best value-only strength of the
+# whole value multiset and the best flush strength of the suit holding
+# five or more cards.  Both tables are grown one card at a time from the
+# five card ones: a six or seven card entry is the best of its entries
+# with one card removed.
+
+
+@lru_cache(maxsize=None)
+def _best_tables() -> Tuple[List[int], Dict[int, int]]:
+    best_flushes = list(_FLUSHES)
+    best_values: Dict[int, int] = {}
+    for n in range(5, 8):
+        for combination in combinations_with_replacement(range(len(_VALUES)), n):
+            distinct = set(combination)
+            if any(combination.count(v) > 4 for v in distinct):
+                continue
+            product = 1
+            for v in combination:
+                product *= _PRIMES[v]
+            if n == 5:
+                best_values[product] = _PAIRED.get(product) or _UNIQUE[
+                    sum(1 << v for v in combination)
+                ]
+                continue
+            best_values[product] = max(
+                best_values[product // _PRIMES[v]] for v in distinct
+            )
+            if len(distinct) == n:
+                mask = sum(1 << v for v in combination)
+                best_flushes[mask] = max(
+                    best_flushes[mask & ~(1 << v)] for v in distinct
+                )
+    return best_flushes, best_values
+
+
+def evaluate_best(codes: Sequence[int]) -> int:
+    """
+    Packed strength of the best five card hand among five to seven codes.
+
+    >>> evaluate_best(Cards.codes_from_string("2H 7H TS TH 9D 9C AH")) == evaluate(Cards.codes_from_string("TS TH 9D 9C AH"))
+    True
+
+    >>> import random
+    >>> from itertools import combinations
+    >>> rng = random.Random(0)
+    >>> hands = [rng.sample(range(52), 7) for _ in range(200)]
+    >>> for _ in range(50):
+    ...     suited = rng.sample(range(3, 52, 4), 6)
+    ...     hands.append(suited + [rng.choice([code for code in range(52) if code not in suited])])
+    >>> all(len(set(hand)) == 7 for hand in hands)
+    True
+    >>> all(
+    ...     evaluate_best(hand) == max(evaluate(five) for five in combinations(hand, 5))
+    ...     for hand in hands
+    ... )
+    True
+    """
+    best_flushes, best_values = _best_tables()
+    return _evaluate_best(codes, best_flushes, best_values)
+
+
+def _evaluate_best(
+    codes: Sequence[int], best_flushes: List[int], best_values: Dict[int, int]
+) -> int:
+    product = 1
+    suit_masks = [0, 0, 0, 0]
+    suit_counts = [0, 0, 0, 0]
+    primes = _CODE_PRIME
+    bits = _CODE_BIT
+    for code in codes:
+        product *= primes[code]
+        suit = code & 3
+        suit_masks[suit] |= bits[code]
+        suit_counts[suit] += 1
+    best = best_values[product]
+    for suit in range(4):
+        if suit_counts[suit] >= 5:
+            flush = best_flushes[suit_masks[suit]]
+            if flush > best:
+                best = flush
+    return best
+
+
+def evaluate_best_many(hands: Iterable[Sequence[int]]) -> List[int]:
+    """
+    evaluate_best() over many hands of codes at once.
+
+    >>> [score_from_strength(s) for s in evaluate_best_many([Cards.codes_from_string("2H 7H TS TH 9D 9C AH"), range(5)])]
+    [TWO_PAIRS,['T', 'T', '9', '9', 'A'], FOUR_OF_A_KIND,['2', '2', '2', '2', '3']]
+    """
+    best_flushes, best_values = _best_tables()
+    return [_evaluate_best(codes, best_flushes, best_values) for codes in hands]
+
+
+def best_strength(cards: Sequence[Card]) -> int:
+    return evaluate_best([card.code for card in cards])
+
+
+def best_score(cards: Sequence[Card]) -> Score:
+    """
+    >>> best_score(Cards.from_string("2H 7H TS TH 9D 9C AH"))
+    TWO_PAIRS,['T', 'T', '9', '9', 'A']
+
+    >>> best_score(Cards.from_string("2H 7H TH JH 4D 8H AH"))
+    FLUSH,['A', 'J', 'T', '8', '7']
+    """
+    return score_from_strength(best_strength(cards))
+
+
 @dataclass
 class RoyalFlush(Rank):
     @staticmethod
@@ -581,6 +1207,51 @@ def rank(hand: Hand) -> Rank:
 
     """
 
+    if len(hand.cards) != 5:
+        return rank_by_matchers(hand)
+    category, groups = _classify(hand)
+    if category is Category.ROYAL_FLUSH:
+        return RoyalFlush(hand)
+    elif category is Category.STRAIGHT_FLUSH:
+        return StraightFlush(rank=hand.highest_card, rank_cards=hand.cards, hand=hand)
+    elif category is Category.FLUSH:
+        return Flush(list(reversed(hand.cards)), hand)
+    elif category is Category.STRAIGHT:
+        return Straight(hand.cards, hand)
+    elif category is Category.HIGH_CARD:
+        return HighCard(highest_cards=list(reversed(hand.cards)), hand=hand)
+
+    # Groups are in ascending value order, like hand.sorted_by_value.
+    fours = [cards for _, cards in groups if len(cards) == 4]
+    threes = [cards for _, cards in groups if len(cards) == 3]
+    pairs = [cards for _, cards in groups if len(cards) == 2]
+    if category is Category.FOUR_OF_A_KIND:
+        return FourOfAKind(hand, four=fours[0])
+    elif category is Category.FULL_HOUSE:
+        return FullHouse(threes[0], pairs[0], hand)
+    elif category is Category.THREE_OF_A_KIND:
+        return ThreeOfAKind(threes[0], hand)
+    elif category is Category.TWO_PAIRS:
+        return TwoPairs(pairs[0], pairs[1], hand)
+    else:
+        return OnePair(pair=pairs[0], hand=hand)
+
+
+def rank_by_matchers(hand: Hand) -> Rank:
+    """
+    Reference implementation of rank(): tries every matcher in turn.
+
+    >>> import random
+    >>> rng = random.Random(0)
+    >>> deck = [Card(value, suit) for value in Value for suit in Suit]
+    >>> hands = [Hand(rng.sample(deck, 5)) for _ in range(300)]
+    >>> hands += [Hand(rng.sample([card for card in deck if card.suit == Suit.S], 5)) for _ in range(30)]
+    >>> all(repr(rank(hand)) == repr(rank_by_matchers(hand)) for hand in hands)
+    True
+    >>> all(score(hand) == score_from_rank(rank_by_matchers(hand)) for hand in hands)
+    True
+    """
+
     matches: List[Callable[[Hand],Optional[Rank]]] = [
         RoyalFlush.match,
         StraightFlush.match,
@@ -603,8 +1274,14 @@ def rank(hand: Hand) -> Rank:
     return m
 
 
-def winner(str: str):
+def winner(str: str, fast: bool = False):
     """
+    >>> winner("5H 5C 6S 7S KD 2C 3S 8S 8D TD", fast=True)
+    2
+
+    >>> winner("4D 6S 9H QH QC 3D 6D 7H QD QS", fast=True)
+    1
+
     # >>> winner("5H 5C 6S 7S KD 2C 3S 8S 8D TD")
     # 2
 
@@ -624,9 +1301,13 @@ def winner(str: str):
     # 1
 
     """
-    score1, score2 = score(Hand(Cards.from_string(str)[0:5])), score(
-        Hand(Cards.from_string(str)[5:])
-    )
+    if fast:
+        codes = Cards.codes_from_string(str)
+        strength1, strength2 = evaluate(codes[0:5]), evaluate(codes[5:])
+        return 0 if strength1 == strength2 else 2 if strength1 < strength2 else 1
+
+    cards = Cards.from_string(str)
+    score1, score2 = score(Hand(cards[0:5])), score(Hand(cards[5:]))
     if score1 == score2:
         return 0
     elif score1 < score2:
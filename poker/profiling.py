@@ -0,0 +1,205 @@
+"""
+Opt-in instrumentation of the poker evaluator.
+
+While a Profiler is enabled it wraps the matchers, Hand.__init__,
+Cards.group_by/diff, the classifier and the stages of winner() with
+counting and timing shims; disabling it puts the originals back, so
+there is no cost at all when profiling is off.
+
+>>> import poker
+>>> with Profiler() as profiler:
+...     poker.rank_by_matchers(poker.Hand.from_string("TS TH 9D 9C AH"))
+...     poker.winner("5H 5C 6S 7S KD 2C 3S 8S 8D TD")
+TwoPairs(pair_one=[9C, 9D], pair_two=[TS, TH])
+2
+>>> snapshot = profiler.snapshot()
+>>> snapshot["match.RoyalFlush"].calls, snapshot["match.TwoPairs"].hits, snapshot["match.OnePair"].calls
+(1, 1, 0)
+>>> snapshot["classify.ONE_PAIR"].calls, snapshot["winner"].calls, snapshot["winner.rank"].calls
+(2, 1, 2)
+>>> hasattr(poker.Hand.__init__, "__wrapped__"), hasattr(poker.winner, "__wrapped__")
+(False, False)
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import poker
+
+
+@dataclass
+class Stat:
+    calls: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+    def __add__(self, other: "Stat") -> "Stat":
+        return Stat(self.calls + other.calls, self.hits + other.hits, self.seconds + other.seconds)
+
+
+@dataclass
+class ProfileSnapshot:
+    stats: Dict[str, Stat] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Stat:
+        return self.stats.get(name, Stat())
+
+    def __add__(self, other: "ProfileSnapshot") -> "ProfileSnapshot":
+        stats = dict(self.stats)
+        for name, stat in other.stats.items():
+            stats[name] = stats.get(name, Stat()) + stat
+        return ProfileSnapshot(stats)
+
+    def report(self) -> str:
+        """
+        >>> print(ProfileSnapshot({"parse": Stat(4, 0, 0.5), "match.Flush": Stat(2, 1, 0.25)}).report())
+        name                          calls       hits    seconds   us/call
+        parse                             4          0     0.5000  125000.0
+        match.Flush                       2          1     0.2500  125000.0
+        """
+        lines = [f"{'name':24} {'calls':>10} {'hits':>10} {'seconds':>10} {'us/call':>9}"]
+        for name, stat in sorted(self.stats.items(), key=lambda item: -item[1].seconds):
+            per_call = stat.seconds / stat.calls * 1e6 if stat.calls else 0.0
+            lines.append(f"{name:24} {stat.calls:10} {stat.hits:10} {stat.seconds:10.4f} {per_call:9.1f}")
+        return "\n".join(lines)
+
+
+_MATCHERS = [
+    poker.RoyalFlush,
+    poker.StraightFlush,
+    poker.FourOfAKind,
+    poker.FullHouse,
+    poker.Flush,
+    poker.Straight,
+    poker.ThreeOfAKind,
+    poker.TwoPairs,
+    poker.OnePair,
+    poker.HighCard,
+]
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self._stats: Dict[str, Stat] = {}
+        self._restore: List[Tuple[Any, str, Any]] = []
+        self._stage: Optional[str] = None
+        self._in_winner = False
+
+    def record(self, name: str, seconds: float, hit: bool = False, calls: int = 1) -> None:
+        stat = self._stats.get(name)
+        if stat is None:
+            stat = self._stats[name] = Stat()
+        stat.calls += calls
+        stat.seconds += seconds
+        if hit:
+            stat.hits += 1
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def snapshot(self) -> ProfileSnapshot:
+        stats = {name: Stat(s.calls, s.hits, s.seconds) for name, s in self._stats.items()}
+        if "winner" in stats:
+            compare = stats["winner"].seconds - sum(
+                stats[name].seconds for name in ("winner.parse", "winner.rank") if name in stats
+            )
+            stats["winner.compare"] = Stat(stats["winner"].calls, 0, compare)
+        return ProfileSnapshot(stats)
+
+    def _timed(self, name: str, f: Callable, hit: Optional[Callable[[Any], bool]] = None) -> Callable:
+        @wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            result = f(*args, **kwargs)
+            self.record(name, time.perf_counter() - started, hit(result) if hit else False)
+            return result
+
+        return wrapper
+
+    def _staged(self, stage: str, name: str, f: Callable) -> Callable:
+        """Times f under name and, for the outermost stage inside winner(), as winner.<stage>."""
+
+        @wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            outer = self._stage is None
+            if outer:
+                self._stage = stage
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                self.record(name, seconds)
+                if outer:
+                    self._stage = None
+                    if self._in_winner:
+                        self.record(f"winner.{stage}", seconds)
+
+        return wrapper
+
+    def _winner(self, f: Callable) -> Callable:
+        @wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            self._in_winner = True
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                self.record("winner", time.perf_counter() - started)
+                self._in_winner = False
+
+        return wrapper
+
+    def _classify(self, f: Callable) -> Callable:
+        @wraps(f)
+        def wrapper(hand: poker.Hand) -> Any:
+            started = time.perf_counter()
+            result = f(hand)
+            self.record(f"classify.{result[0].value}", time.perf_counter() - started)
+            return result
+
+        return wrapper
+
+    def _patch(self, owner: Any, name: str, replacement: Any) -> None:
+        self._restore.append((owner, name, owner.__dict__[name]))
+        setattr(owner, name, replacement)
+
+    def enable(self) -> None:
+        if self._restore:
+            return
+        for cls in _MATCHERS:
+            self._patch(
+                cls,
+                "match",
+                staticmethod(self._timed(f"match.{cls.__name__}", cls.match, lambda r: r is not None)),
+            )
+        self._patch(poker.Hand, "__init__", self._timed("Hand.__init__", poker.Hand.__init__))
+        for name in ("group_by", "diff"):
+            self._patch(poker.Cards, name, staticmethod(self._timed(f"Cards.{name}", getattr(poker.Cards, name))))
+        for name in ("from_string", "codes_from_string", "parse_deals"):
+            self._patch(
+                poker.Cards, name, staticmethod(self._staged("parse", f"Cards.{name}", getattr(poker.Cards, name)))
+            )
+        for name in ("score", "evaluate"):
+            self._patch(poker, name, self._staged("rank", name, getattr(poker, name)))
+        self._patch(poker, "_classify", self._classify(poker._classify))
+        self._patch(poker, "winner", self._winner(poker.winner))
+
+    def disable(self) -> None:
+        while self._restore:
+            owner, name, original = self._restore.pop()
+            setattr(owner, name, original)
+
+    def __enter__(self) -> "Profiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.disable()
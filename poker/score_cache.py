@@ -0,0 +1,143 @@
+"""
+Bounded LRU cache of hand Scores keyed on the hand's suit-isomorphism class.
+
+Relabelling suits never changes a Score, so hands are keyed on the
+sorted masks of the values held in each suit.  The 2,598,960 five card
+hands fall into 134,459 such classes.
+"""
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+from poker import Card, Hand, Score, score, score_from_strength
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def canonical(codes: Iterable[int]) -> int:
+    """
+    Canonical form of a hand of card codes under suit permutation.
+
+    >>> from poker import Cards
+    >>> canonical(Cards.codes_from_string("2C 2D 3C 7S 9H")) == canonical(Cards.codes_from_string("2D 2C 3D 7H 9S"))
+    True
+    >>> canonical(Cards.codes_from_string("2C 2D 3C 7S 9H")) == canonical(Cards.codes_from_string("2C 2D 3S 7C 9H"))
+    False
+    """
+    masks = [0, 0, 0, 0]
+    for code in codes:
+        masks[code & 3] |= 1 << (code >> 2)
+    masks.sort(reverse=True)
+    return (masks[0] << 39) | (masks[1] << 26) | (masks[2] << 13) | masks[3]
+
+
+class ScoreCache:
+    """
+    >>> from poker import Cards
+    >>> cache = ScoreCache(maxsize=2)
+    >>> cache.score(Cards.from_string("TS TH 9D 9C AH"))
+    TWO_PAIRS,['T', 'T', '9', '9', 'A']
+    >>> cache.score(Cards.from_string("TD TC 9H 9S AD"))
+    TWO_PAIRS,['T', 'T', '9', '9', 'A']
+    >>> cache.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+    >>> cache.prewarm([Cards.from_string("2C 3C 4C 5C 6C"), Cards.from_string("2C 3C 4C 5C 7D")])
+    >>> cache.cache_info()
+    CacheInfo(hits=1, misses=3, maxsize=2, currsize=2)
+    >>> cache.score(Cards.from_string("TS TH 9D 9C AH")) == score(Hand.from_string("TS TH 9D 9C AH"))
+    True
+    >>> cache.cache_info().misses
+    4
+    """
+
+    def __init__(self, maxsize: int = 200_000) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._scores: "OrderedDict[int, Score]" = OrderedDict()
+
+    def score(self, cards: Sequence[Card]) -> Score:
+        key = canonical([card.code for card in cards])
+        cached = self._scores.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._scores.move_to_end(key)
+            return cached
+        self.misses += 1
+        s = score(Hand(list(cards)))
+        self._put(key, s)
+        return s
+
+    def _put(self, key: int, s: Score) -> None:
+        self._scores[key] = s
+        self._scores.move_to_end(key)
+        if len(self._scores) > self.maxsize:
+            self._scores.popitem(last=False)
+
+    def prewarm(self, hands: Iterable[Sequence[Card]]) -> None:
+        for cards in hands:
+            self.score(cards)
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._scores))
+
+    def clear(self) -> None:
+        self._scores.clear()
+        self.hits = self.misses = 0
+
+    def save(self, path: str) -> None:
+        """
+        Writes the cached entries, least recently used first, as JSON.
+
+        >>> import os, tempfile
+        >>> from poker import Cards
+        >>> cache = ScoreCache()
+        >>> cache.prewarm([Cards.from_string("2C 3C 4C 5C 6C"), Cards.from_string("TS TH 9D 9C AH")])
+        >>> path = os.path.join(tempfile.mkdtemp(), "scores.json")
+        >>> cache.save(path)
+        >>> loaded = ScoreCache.load(path)
+        >>> loaded.cache_info()
+        CacheInfo(hits=0, misses=0, maxsize=200000, currsize=2)
+        >>> loaded.score(Cards.from_string("2D 3D 4D 5D 6D"))
+        STRAIGHT_FLUSH,['2', '6', '5', '4', '3']
+        >>> loaded.cache_info().hits
+        1
+        """
+        with open(path, "wt") as f:
+            json.dump(
+                {
+                    "maxsize": self.maxsize,
+                    "entries": [[key, s.key] for key, s in self._scores.items()],
+                },
+                f,
+            )
+
+    @staticmethod
+    def load(path: str, maxsize: Optional[int] = None) -> "ScoreCache":
+        with open(path, "rt") as f:
+            data = json.load(f)
+        cache = ScoreCache(maxsize if maxsize is not None else data["maxsize"])
+        for key, strength in data["entries"]:
+            cache._put(key, score_from_strength(strength))
+        return cache
+
+
+default_cache = ScoreCache()
+
+
+def cached_score(cards: Sequence[Card]) -> Score:
+    return default_cache.score(cards)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
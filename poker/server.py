@@ -0,0 +1,293 @@
+"""
+Line-oriented asyncio service in front of the poker evaluator.
+
+Requests, one per line:
+
+    SCORE <5 cards>     ->  OK <category> <score values...>
+    WINNER <10 cards>   ->  OK <0 for a tie, else the winning player>
+    STATS               ->  OK requests=... batches=... p50_ms=... p99_ms=...
+
+Malformed requests get "ERR <reason>".  Requests from all connections go
+through one bounded queue and are evaluated in micro-batches, inline or
+on a process pool; a full queue stops connections from being read, and
+each connection answers its pipelined requests in order.
+
+    python server.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional, Tuple, Union
+
+from poker import Cards, InvalidCard, evaluate, score_from_strength
+
+Request = Tuple[str, bytes]
+# A reply as written back in request order: ready text, a pending
+# evaluation, or STATS, which is taken once the requests before it are done.
+Answer = Union[str, "asyncio.Future[str]", Callable[[], str]]
+
+
+def _answer(kind: str, codes: bytes) -> str:
+    if kind == "SCORE":
+        s = score_from_strength(evaluate(codes))
+        return " ".join(["OK", s.category.value] + [value.value for value in s.highest_cards])
+    s1, s2 = evaluate(codes[0:5]), evaluate(codes[5:10])
+    return f"OK {0 if s1 == s2 else 1 if s1 > s2 else 2}"
+
+
+def evaluate_batch(requests: List[Request]) -> List[str]:
+    """
+    >>> evaluate_batch([("SCORE", bytes(Cards.codes_from_string("TS TH 9D 9C AH"))),
+    ...                 ("WINNER", bytes(Cards.codes_from_string("5H 5C 6S 7S KD 2C 3S 8S 8D TD")))])
+    ['OK TWO_PAIRS T T 9 9 A', 'OK 2']
+    """
+    return [_answer(kind, codes) for kind, codes in requests]
+
+
+def parse_request(line: str) -> Request:
+    """
+    >>> kind, codes = parse_request("score TS TH 9D 9C AH")
+    >>> kind, Cards.from_codes(codes)
+    ('SCORE', [TS, TH, 9D, 9C, AH])
+
+    >>> parse_request("WINNER TS TH")
+    Traceback (most recent call last):
+    ...
+    ValueError: WINNER needs 10 cards
+    """
+    kind, _, cards = line.strip().partition(" ")
+    kind = kind.upper()
+    expected = {"SCORE": 5, "WINNER": 10}.get(kind)
+    if expected is None:
+        raise ValueError(f"Unknown request {kind}")
+    codes = Cards.codes_from_string(cards)
+    if len(codes) != expected:
+        raise ValueError(f"{kind} needs {expected} cards")
+    if len(set(codes)) != len(codes):
+        raise ValueError("Duplicate cards")
+    return kind, bytes(codes)
+
+
+@dataclass
+class Pending:
+    request: Request
+    future: "asyncio.Future[str]"
+    enqueued: float
+
+
+class EvaluationServer:
+    """
+    >>> async def demo():
+    ...     server = EvaluationServer(max_delay=0.001)
+    ...     listener = await server.start(port=0)
+    ...     port = listener.sockets[0].getsockname()[1]
+    ...     reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    ...     writer.write(b"SCORE TS TH 9D 9C AH\\nWINNER 5H 5C 6S 7S KD 2C 3S 8S 8D TD\\nSCORE 1H\\nSCORE A\\xe9\\n")
+    ...     writer.write_eof()
+    ...     answers = (await reader.read()).decode().splitlines()
+    ...     writer.close()
+    ...     await server.close()
+    ...     return answers, server.requests
+    >>> asyncio.run(demo())
+    (['OK TWO_PAIRS T T 9 9 A', 'OK 2', 'ERR Invalid card "1H"', 'ERR Invalid card "A\\\\xe9"'], 2)
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 256,
+        max_delay: float = 0.002,
+        queue_size: int = 10_000,
+        pending_per_connection: int = 1_000,
+        executor: Optional[Executor] = None,
+        latency_samples: int = 10_000,
+    ) -> None:
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.pending_per_connection = pending_per_connection
+        self.executor = executor
+        self.requests = 0
+        self.batches = 0
+        self.latencies: Deque[float] = deque(maxlen=latency_samples)
+        self._queue: Optional["asyncio.Queue[Pending]"] = None
+        self._batcher: Optional["asyncio.Task[None]"] = None
+        self._servers: List[asyncio.AbstractServer] = []
+
+    async def start(
+        self, host: str = "127.0.0.1", port: Optional[int] = None, path: Optional[str] = None
+    ) -> asyncio.AbstractServer:
+        if self._queue is None:
+            if self.executor is not None:
+                # Fork the pool's workers before any socket is open, or they
+                # would inherit client connections and keep them from closing.
+                await asyncio.get_running_loop().run_in_executor(self.executor, evaluate_batch, [])
+            self._queue = asyncio.Queue(self.queue_size)
+            self._batcher = asyncio.create_task(self._run_batches())
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        self._servers.append(server)
+        return server
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> str:
+        latencies = sorted(self.latencies)
+
+        def ms(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3 if latencies else 0.0
+
+        queued = self._queue.qsize() if self._queue is not None else 0
+        average = self.requests / self.batches if self.batches else 0.0
+        return (
+            f"OK requests={self.requests} batches={self.batches} avg_batch={average:.1f} "
+            f"queued={queued} p50_ms={ms(0.5):.3f} p99_ms={ms(0.99):.3f}"
+        )
+
+    async def submit(self, request: Request) -> str:
+        return await (await self._enqueue(request))
+
+    async def _enqueue(self, request: Request) -> "asyncio.Future[str]":
+        """Queues request, waiting for room, and returns its pending answer."""
+        assert self._queue is not None, "start() the server first"
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        await self._queue.put(Pending(request, future, time.perf_counter()))
+        return future
+
+    async def _run_batches(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            requests = [pending.request for pending in batch]
+            try:
+                if self.executor is not None:
+                    answers = await loop.run_in_executor(self.executor, evaluate_batch, requests)
+                else:
+                    answers = evaluate_batch(requests)
+            except Exception as e:
+                answers = [f"ERR {e}"] * len(batch)
+
+            done = time.perf_counter()
+            self.batches += 1
+            self.requests += len(batch)
+            for pending, answer in zip(batch, answers):
+                self.latencies.append(done - pending.enqueued)
+                if not pending.future.done():
+                    pending.future.set_result(answer)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        answers: "asyncio.Queue[Optional[Answer]]" = asyncio.Queue(self.pending_per_connection)
+        replier = asyncio.create_task(self._reply(answers, writer))
+        reading = asyncio.create_task(self._read(reader, answers))
+        try:
+            await asyncio.wait({reading, replier}, return_when=asyncio.FIRST_COMPLETED)
+            if not replier.done():
+                # Ends the replies, unless the replier fails before the
+                # queue has room.
+                closing = asyncio.ensure_future(answers.put(None))
+                await asyncio.wait({closing, replier}, return_when=asyncio.FIRST_COMPLETED)
+                closing.cancel()
+            await replier
+        finally:
+            # A dead replier no longer drains answers, so stop reading too.
+            reading.cancel()
+            replier.cancel()
+            await asyncio.gather(reading, replier, return_exceptions=True)
+
+    async def _read(
+        self, reader: asyncio.StreamReader, answers: "asyncio.Queue[Optional[Answer]]"
+    ) -> None:
+        while line := await reader.readline():
+            text = line.decode("ascii", "backslashreplace").strip()
+            if not text:
+                continue
+            answer: Answer
+            if text.upper() == "STATS":
+                answer = self.stats
+            else:
+                try:
+                    request = parse_request(text)
+                except (InvalidCard, ValueError) as e:
+                    answer = f"ERR {e}"
+                else:
+                    # Waiting for room in the shared queue stops reading.
+                    answer = await self._enqueue(request)
+            await answers.put(answer)
+
+    async def _reply(
+        self, answers: "asyncio.Queue[Optional[Answer]]", writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while (answer := await answers.get()) is not None:
+                if callable(answer):
+                    answer = answer()
+                elif not isinstance(answer, str):
+                    answer = await answer
+                writer.write(answer.encode("ascii", "backslashreplace") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    executor = ProcessPoolExecutor(args.workers) if args.workers else None
+    server = EvaluationServer(
+        max_batch=args.max_batch,
+        max_delay=args.max_delay_ms / 1e3,
+        queue_size=args.queue_size,
+        executor=executor,
+    )
+    listener = await server.start(args.host, args.port, args.unix)
+    print(f"serving on {args.unix or listener.sockets[0].getsockname()}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        if executor is not None:
+            executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poker hand evaluation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket instead")
+    parser.add_argument("--workers", type=int, default=0, help="evaluate batches on a process pool")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
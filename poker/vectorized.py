@@ -0,0 +1,125 @@
+"""
+NumPy versions of poker.evaluate() and poker.winner() over whole arrays of
+card codes, for batches where per-hand Python overhead dominates.
+
+Strengths are the same packed ints poker.evaluate() returns, so they order
+exactly like Scores.
+"""
+from typing import Iterable
+
+import numpy as np
+
+from poker import Cards, Category, Value
+
+_STRAIGHT_FLUSH = Category.STRAIGHT_FLUSH.ordinal
+_SHIFTS = np.array([16, 12, 8, 4, 0], dtype=np.int64)
+
+
+def encode_deals(lines: Iterable[str]) -> np.ndarray:
+    """
+    (N, 10) uint8 array of card codes, one row per non-empty deal line.
+
+    >>> encode_deals(["2C 3C 4C 5C 6C 2D 3D 4D 5D 6D\\n", ""]).shape
+    (1, 10)
+
+    >>> encode_deals(["2C 3C 4C 5C 6C 2D 3D 4D 5D", "6D 2H 3H 4H 5H 6H 7H 8H 9H TH AH"])
+    Traceback (most recent call last):
+    ...
+    ValueError: Line 1 has 9 cards, expected 10
+    """
+    rows = []
+    for line_number, line in enumerate(lines, 1):
+        codes = Cards.codes_from_string(line)
+        if codes:
+            if len(codes) != 10:
+                raise ValueError(f"Line {line_number} has {len(codes)} cards, expected 10")
+            rows.append(codes)
+    return np.array(rows, dtype=np.uint8).reshape(-1, 10)
+
+
+def evaluate(hands: np.ndarray) -> np.ndarray:
+    """
+    Packed strengths of an (N, 5) array of card codes.
+
+    >>> import random
+    >>> import poker
+    >>> rng = random.Random(0)
+    >>> hands = np.array([rng.sample(range(52), 5) for _ in range(2000)]
+    ...     + [rng.sample(range(2, 52, 4), 5) for _ in range(200)]
+    ...     + [[32, 36, 40, 44, 48], [33, 37, 41, 45, 49]], dtype=np.uint8)
+    >>> bool((evaluate(hands) == [poker.evaluate(hand) for hand in hands.tolist()]).all())
+    True
+
+    >>> evaluate(np.zeros((0, 5), dtype=np.uint8))
+    array([], dtype=int64)
+    """
+    hands = np.asarray(hands, dtype=np.int64)
+    values = hands >> 2
+    suits = hands & 3
+
+    counts = (values[:, :, None] == np.arange(len(Value))).sum(axis=1)
+    card_counts = np.take_along_axis(counts, values, axis=1)
+    # Values ordered by (count, value) descending: pairs before kickers.
+    ordered = -np.sort(-(card_counts * 16 + values), axis=1) & 0xF
+
+    distinct = (counts > 0).sum(axis=1)
+    most = counts.max(axis=1)
+    flush = (suits == suits[:, :1]).all(axis=1)
+    unique = distinct == 5
+    straight = unique & (ordered[:, 0] - ordered[:, 4] == 4)
+    royal = flush & straight & (ordered[:, 4] == Value.TEN.ordinal)
+
+    category = np.select(
+        [
+            royal,
+            flush & straight,
+            most == 4,
+            (most == 3) & (distinct == 2),
+            flush,
+            straight,
+            most == 3,
+            (most == 2) & (distinct == 3),
+            most == 2,
+        ],
+        [
+            Category.ROYAL_FLUSH.ordinal,
+            Category.STRAIGHT_FLUSH.ordinal,
+            Category.FOUR_OF_A_KIND.ordinal,
+            Category.FULL_HOUSE.ordinal,
+            Category.FLUSH.ordinal,
+            Category.STRAIGHT.ordinal,
+            Category.THREE_OF_A_KIND.ordinal,
+            Category.TWO_PAIRS.ordinal,
+            Category.ONE_PAIR.ordinal,
+        ],
+        Category.HIGH_CARD.ordinal,
+    )
+
+    # Straights list their values lowest first, straight flushes put the
+    # lowest value in front of the rest, royal flushes list none.
+    score_values = np.where(straight[:, None] & ~flush[:, None], ordered[:, ::-1], ordered)
+    score_values = np.where(
+        (category == _STRAIGHT_FLUSH)[:, None], np.roll(ordered, 1, axis=1), score_values
+    )
+    score_values = np.where(royal[:, None], 0, score_values)
+
+    return (category.astype(np.int64) << 20) | (score_values << _SHIFTS).sum(axis=1)
+
+
+def winner(deals: np.ndarray) -> np.ndarray:
+    """
+    poker.winner() over an (N, 10) array of deals: 0 for a tie, otherwise
+    the winning player.
+
+    >>> import poker
+    >>> with open("poker.txt") as f:
+    ...     lines = f.readlines()
+    >>> results = winner(encode_deals(lines))
+    >>> np.bincount(results, minlength=3).tolist()
+    [0, 376, 624]
+    >>> results.tolist() == [poker.winner(line) for line in lines]
+    True
+    """
+    deals = np.asarray(deals)
+    s1, s2 = evaluate(deals[:, :5]), evaluate(deals[:, 5:])
+    return np.where(s1 == s2, 0, np.where(s1 > s2, 1, 2))